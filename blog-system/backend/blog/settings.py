@@ -152,7 +152,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # 页码分页；声明了 cursor_ordering 的视图可通过 cursor 参数使用键集分页
+    'DEFAULT_PAGINATION_CLASS': 'common.pagination.KeysetPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -192,6 +193,60 @@ AUTH_USER_MODEL = 'users.User'
 # 前端 URL 配置（用于 RSS Feed 链接）
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
 
+# 预生成 Feed 文件配置
+FEED_ROOT = os.path.join(BASE_DIR, 'feeds')  # Feed 文件目录（目录结构与 URL 一致），由前端代理直接提供
+FEED_SITE_URL = os.environ.get('FEED_SITE_URL', 'http://localhost:8000')  # 后端站点地址，用于 Feed 中的自身链接
+FEED_REBUILD_DELAY = 2  # 数据变更后延迟重新生成的时间（秒），期间的多次变更只生成一次
+
+# 缓存配置
+# 多进程部署时请设置 REDIS_URL 使用共享缓存，否则各进程的缓存失效通知互不可见
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {
+                # 文章渲染按块缓存，默认的 300 条上限不够用
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
+# 匿名只读接口的响应缓存时间，也是接口 ETag 的最长有效时间（秒）
+# 相关模型保存或删除时缓存自动失效；浏览量、热度等通过批量更新写入的字段在缓存过期后刷新
+RESPONSE_CACHE_TIMEOUT = 300
+
+# 站点设置和导航菜单在进程内缓存，每隔该时间（秒）检查一次其他进程是否修改了数据
+SITE_SETTINGS_CHECK_INTERVAL = 1
+
+# 文章搜索配置
+# 搜索后端类路径，为空时自动选择（SQLite 使用 FTS5 全文索引，其他数据库使用 icontains 查询）
+POST_SEARCH_BACKEND = os.environ.get('POST_SEARCH_BACKEND', '')
+POST_SEARCH_MAX_RESULTS = 1000  # 单次搜索最多返回的结果数
+POST_SEARCH_NGRAM_SIZE = 2  # 中文分词的 n-gram 长度（2 或 3），修改后需执行 rebuild_search_index
+POST_SUGGESTION_REBUILD_INTERVAL = 300  # 搜索建议索引的定期重建间隔（秒）
+
+# 文章浏览量计数配置
+POST_VIEW_DEDUPE_WINDOW = 3600  # 同一 IP 重复浏览不计数的时间窗口（秒）
+POST_VIEW_FLUSH_INTERVAL = 10  # 浏览量批量写入数据库的间隔（秒）
+POST_VIEW_FLUSH_BATCH_SIZE = 500  # 缓冲的浏览记录达到该数量时立即写入
+
+# 文章渲染配置
+POST_RENDER_CACHE_TIMEOUT = 86400  # 渲染结果（按内容哈希）的缓存时间（秒）
+POST_RENDER_ASYNC_THRESHOLD = 20000  # 自动保存时超过该字符数的文章交给后台进程池渲染
+POST_RENDER_WORKERS = 2  # 后台渲染进程数
+POST_READ_WORDS_PER_MINUTE = 200  # 估算阅读时间的阅读速度（中日韩字符按字、其他文字按单词计）
+
+# 文章归档缓存时间（秒），文章变更时会自动失效
+POST_ARCHIVE_CACHE_TIMEOUT = 3600
+
 # 邮件配置（默认配置，可在站点设置中覆盖）
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.environ.get('EMAIL_HOST', '')
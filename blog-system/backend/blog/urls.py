@@ -18,8 +18,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from posts.feeds import PostsFeed, CategoryPostsFeed
-from comments.feeds import CommentsFeed
+from posts.feeds import (
+    PostsFeed, AtomPostsFeed, JsonPostsFeed,
+    CategoryPostsFeed, AtomCategoryPostsFeed, JsonCategoryPostsFeed,
+)
+from comments.feeds import CommentsFeed, AtomCommentsFeed, JsonCommentsFeed
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -33,10 +36,16 @@ urlpatterns = [
     path('', include('links.urls')),
     path('', include('settings.urls')),
     path('', include('music.urls')),
-    # RSS Feeds
+    # RSS Feeds（另有 Atom 和 JSON Feed 格式，预生成的文件见 posts.feed_files）
     path('feed/', PostsFeed(), name='posts-feed'),
+    path('feed/atom/', AtomPostsFeed(), name='posts-feed-atom'),
+    path('feed/json/', JsonPostsFeed(), name='posts-feed-json'),
     path('feed/comments/', CommentsFeed(), name='comments-feed'),
+    path('feed/comments/atom/', AtomCommentsFeed(), name='comments-feed-atom'),
+    path('feed/comments/json/', JsonCommentsFeed(), name='comments-feed-json'),
     path('feed/category/<slug:slug>/', CategoryPostsFeed(), name='category-feed'),
+    path('feed/category/<slug:slug>/atom/', AtomCategoryPostsFeed(), name='category-feed-atom'),
+    path('feed/category/<slug:slug>/json/', JsonCategoryPostsFeed(), name='category-feed-json'),
 ]
 
 # 开发环境下的媒体文件服务
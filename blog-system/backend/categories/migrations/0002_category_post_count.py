@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:51
+
+from django.db import migrations, models
+
+
+def backfill_post_counts(apps, schema_editor):
+    """统计现有分类的已发布文章数"""
+    Category = apps.get_model('categories', 'Category')
+    Post = apps.get_model('posts', 'Post')
+
+    counts = {}
+    for category_id in Post.objects.filter(status='published', category__isnull=False).values_list('category_id', flat=True):
+        counts[category_id] = counts.get(category_id, 0) + 1
+    for category_id, count in counts.items():
+        Category.objects.filter(pk=category_id).update(post_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('posts', '0010_posttermvector_relatedpost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='已发布的文章数，由系统自动维护', verbose_name='文章数'),
+        ),
+        migrations.RunPython(backfill_post_counts, migrations.RunPython.noop),
+    ]
@@ -17,6 +17,7 @@ class Category(models.Model):
         verbose_name='父分类'
     )
     order = models.IntegerField(default=0, verbose_name='排序')
+    post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='文章数', help_text='已发布的文章数，由系统自动维护')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
 
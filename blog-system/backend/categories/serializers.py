@@ -4,7 +4,7 @@ from .models import Category
 
 class CategorySerializer(serializers.ModelSerializer):
     """分类序列化器"""
-    post_count = serializers.SerializerMethodField()
+    post_count = serializers.IntegerField(read_only=True)
     children = serializers.SerializerMethodField()
 
     class Meta:
@@ -12,10 +12,17 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'cover', 'parent', 'order', 'post_count', 'children', 'created_at']
         read_only_fields = ['id', 'created_at']
 
-    def get_post_count(self, obj):
-        return obj.posts.filter(status='published').count()
-
     def get_children(self, obj):
-        children = obj.children.all()
-        return CategorySerializer(children, many=True).data
+        children = self._get_children_map().get(obj.pk, [])
+        return CategorySerializer(children, many=True, context=self.context).data
 
+    def _get_children_map(self):
+        """一次查询加载全部分类并按父分类分组（同一次序列化内共享）"""
+        children_map = self.context.get('_category_children')
+        if children_map is None:
+            children_map = {}
+            for category in Category.objects.filter(parent__isnull=False):
+                children_map.setdefault(category.parent_id, []).append(category)
+            if isinstance(self.context, dict):
+                self.context['_category_children'] = children_map
+        return children_map
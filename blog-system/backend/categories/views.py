@@ -1,10 +1,14 @@
 from rest_framework import viewsets, permissions
 from .models import Category
 from .serializers import CategorySerializer
+from posts.models import Post
+from common.cache import CachedResponseMixin
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """分类视图集"""
+    # 文章数随文章发布、撤回刷新
+    cache_models = (Category, Post)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
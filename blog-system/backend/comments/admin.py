@@ -1,12 +1,26 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.db.models import Q
 from .models import Comment, CommentLike
+from .content_objects import attach_content_objects
 from common.email import send_comment_approval_notification
+from posts.hot import refresh_comment_counts_for
+from posts.feed_files import invalidate_feed_files
+from common.cache import bump_model_generation
+
+
+class CommentChangeList(ChangeList):
+    """评论列表：当前页评论的关联对象按类型批量加载"""
+
+    def get_results(self, request):
+        super().get_results(request)
+        attach_content_objects(self.result_list)
 
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ['content_object', 'author', 'parent', 'is_approved', 'created_at']
+    list_select_related = ['author', 'parent__author']
     list_filter = ['is_approved', 'created_at']
     search_fields = ['content', 'author__username']
     readonly_fields = ['ip_address', 'user_agent', 'created_at', 'updated_at']
@@ -35,13 +49,37 @@ class CommentAdmin(admin.ModelAdmin):
                 super().save_model(request, obj, form, change)
         else:
             super().save_model(request, obj, form, change)
+
+    def get_changelist(self, request, **kwargs):
+        return CommentChangeList
+
+    def _load_for_notification(self, queryset):
+        """更新前取出选中的评论（筛选条件可能包含审核状态），并批量加载通知需要的关联对象"""
+        return attach_content_objects(list(queryset.select_related('author')))
+    
+    def _set_approved(self, queryset, approved):
+        """
+        批量修改审核状态
+
+        queryset.update() 不触发信号，这里刷新文章评论数、更新评论的版本号并重新生成评论 Feed 文件，
+        使缓存的响应和 Feed 立即失效。
+
+        Returns:
+            tuple: (选中的评论, 更新的条数)
+        """
+        comments = self._load_for_notification(queryset)
+        updated = queryset.update(is_approved=approved)
+        refresh_comment_counts_for(comments)
+        bump_model_generation(Comment)
+        invalidate_feed_files('comments')
+        return comments, updated
     
     @admin.action(description='批量通过审核')
     def approve_comments(self, request, queryset):
         """批量通过审核"""
-        updated = queryset.update(is_approved=True)
+        comments, updated = self._set_approved(queryset, True)
         # 发送通知
-        for comment in queryset:
+        for comment in comments:
             try:
                 send_comment_approval_notification(comment, approved=True)
             except Exception as e:
@@ -53,9 +91,9 @@ class CommentAdmin(admin.ModelAdmin):
     @admin.action(description='批量拒绝审核')
     def reject_comments(self, request, queryset):
         """批量拒绝审核"""
-        updated = queryset.update(is_approved=False)
+        comments, updated = self._set_approved(queryset, False)
         # 发送通知
-        for comment in queryset:
+        for comment in comments:
             try:
                 send_comment_approval_notification(comment, approved=False)
             except Exception as e:
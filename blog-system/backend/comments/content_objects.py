@@ -0,0 +1,41 @@
+"""
+评论关联对象的批量加载
+
+Comment.content_object 是 GenericForeignKey，不能 select_related，逐条访问时每条评论各查询一次。
+attach_content_objects 按内容类型分组，每种类型用一次 in_bulk 取回对象并写入字段缓存，
+之后访问 comment.content_object 不再查询。
+"""
+from collections import defaultdict
+from django.contrib.contenttypes.models import ContentType
+from .models import Comment
+
+
+def attach_content_objects(comments, querysets=None):
+    """
+    批量加载评论关联的对象
+
+    Args:
+        comments: 评论列表或查询集（查询集会被求值，之后遍历同一查询集不再查询）
+        querysets: {模型: 查询集}，指定加载某种对象使用的查询集（如 only()、select_related()）
+
+    Returns:
+        传入的 comments；关联对象已不存在的评论，content_object 为 None
+    """
+    field = Comment._meta.get_field('content_object')
+    pending = [comment for comment in comments if not field.is_cached(comment)]
+    ids_by_type = defaultdict(set)
+    for comment in pending:
+        ids_by_type[comment.content_type_id].add(comment.object_id)
+
+    objects = {}
+    for content_type_id, object_ids in ids_by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            # 模型已被移除
+            continue
+        queryset = (querysets or {}).get(model, model._base_manager.all())
+        objects[content_type_id] = queryset.in_bulk(object_ids)
+
+    for comment in pending:
+        field.set_cached_value(comment, objects.get(comment.content_type_id, {}).get(comment.object_id))
+    return comments
@@ -3,17 +3,38 @@
 """
 from django.contrib.syndication.views import Feed
 from django.urls import reverse
-from django.utils.feedgenerator import Rss201rev2Feed
+from django.utils.feedgenerator import Rss201rev2Feed, Atom1Feed
 from django.contrib.contenttypes.models import ContentType
 from .models import Comment
+from .content_objects import attach_content_objects
 from settings.models import SiteSettings
+from posts.models import Post
+from posts.feed_files import StaticFeedMixin
+from common.cache import ConditionalFeedMixin
+from common.feedgenerator import JsonFeed
 
 
-class CommentsFeed(Feed):
+class CommentsFeed(ConditionalFeedMixin, StaticFeedMixin, Feed):
     """评论 RSS Feed"""
+    # 评论标题和链接取自评论的对象（文章）
+    cache_models = (Comment, Post, SiteSettings)
     feed_type = Rss201rev2Feed
-    title = "最新评论"
-    description = "博客的最新评论"
+    feed_kind = 'comments'
+    
+    def title(self):
+        """Feed 标题（站点名称）"""
+        try:
+            site_settings = SiteSettings.get_settings()
+            return f"{site_settings.site_name} - 最新评论"
+        except Exception:
+            return "最新评论"
+    
+    def description(self):
+        """Feed 描述（站点描述）"""
+        try:
+            return SiteSettings.get_settings().site_description or "博客的最新评论"
+        except Exception:
+            return "博客的最新评论"
     
     def link(self, request=None):
         """Feed 链接（前端 URL）"""
@@ -30,20 +51,12 @@ class CommentsFeed(Feed):
                 frontend_url = f"{scheme}://{host}"
         return frontend_url or 'http://localhost:5173'
     
-    def __init__(self):
-        super().__init__()
-        try:
-            site_settings = SiteSettings.get_settings()
-            self.title = f"{site_settings.site_name} - 最新评论"
-            self.description = site_settings.site_description or "博客的最新评论"
-        except Exception:
-            pass
-    
     def items(self):
-        """返回最新的已审核评论"""
-        return Comment.objects.filter(
+        """返回最新的已审核评论（评论的文章按类型批量加载）"""
+        comments = list(Comment.objects.filter(
             is_approved=True
-        ).select_related('author', 'content_object').order_by('-created_at')[:30]
+        ).select_related('author').order_by('-created_at')[:30])
+        return attach_content_objects(comments, querysets={Post: Post.objects.only('id', 'title', 'slug')})
     
     def item_title(self, item):
         """评论标题"""
@@ -79,3 +92,13 @@ class CommentsFeed(Feed):
         """更新时间"""
         return item.updated_at
 
+
+class AtomCommentsFeed(CommentsFeed):
+    """评论 Atom Feed"""
+    feed_type = Atom1Feed
+
+
+class JsonCommentsFeed(CommentsFeed):
+    """评论 JSON Feed"""
+    feed_type = JsonFeed
+    file_name = 'index.json'
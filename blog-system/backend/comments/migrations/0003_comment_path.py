@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:54
+
+from django.db import migrations, models
+
+# 迁移时的路径编码（固定写出，不引用 comments.models，重放迁移时不受之后代码修改的影响）
+PATH_STEP = 6
+
+
+def encode_path_segment(comment_id):
+    """将评论 ID 编码为定长 36 进制路径段"""
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    segment = ''
+    while comment_id:
+        comment_id, remainder = divmod(comment_id, 36)
+        segment = digits[remainder] + segment
+    return segment.rjust(PATH_STEP, '0')
+
+
+def backfill_paths(apps, schema_editor):
+    """根据父评论计算现有评论的物化路径"""
+    Comment = apps.get_model('comments', 'Comment')
+    parents = dict(Comment.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def build(comment_id):
+        if comment_id not in paths:
+            chain = []
+            current = comment_id
+            while current is not None and current not in paths:
+                chain.append(current)
+                current = parents.get(current)
+            path, depth = paths.get(current, ('', -1))
+            for node in reversed(chain):
+                path, depth = path + encode_path_segment(node), depth + 1
+                paths[node] = (path, depth)
+        return paths[comment_id]
+
+    comments = list(Comment.objects.only('id'))
+    for comment in comments:
+        comment.path, comment.depth = build(comment.id)
+    Comment.objects.bulk_update(comments, ['path', 'depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, help_text='由系统根据父评论自动维护', max_length=255, verbose_name='路径'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content_type', 'object_id', 'path'], name='comments_co_content_b4cd65_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['path'], name='comments_co_path_242184_idx'),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:15
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def count_existing_likes(apps, schema_editor):
+    """统计现有评论的点赞数"""
+    Comment = apps.get_model('comments', 'Comment')
+    CommentLike = apps.get_model('comments', 'CommentLike')
+    likes = CommentLike.objects.filter(
+        comment=OuterRef('pk')
+    ).order_by().values('comment').annotate(count=Count('id')).values('count')
+    Comment.objects.update(likes=Coalesce(Subquery(likes), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_comment_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='likes',
+            field=models.PositiveIntegerField(default=0, verbose_name='点赞数'),
+        ),
+        migrations.AlterField(
+            model_name='commentlike',
+            name='comment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='like_records', to='comments.comment'),
+        ),
+        migrations.RunPython(count_existing_likes, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,38 @@
 from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 
 User = get_user_model()
 
+# 物化路径：每层使用评论 ID 的定长 36 进制编码，按路径排序即为整棵评论树的先序遍历
+PATH_STEP = 6
+PATH_MAX_LENGTH = 255
+MAX_DEPTH = PATH_MAX_LENGTH // PATH_STEP - 1
+# 大于路径中所有字符（0-9a-z）的字符，用于构造子树的路径范围
+PATH_END = '{'
+
+
+def descendants_q(path):
+    """
+    路径为 path 的评论的所有后代（不含自身）
+
+    使用范围比较而不是 LIKE 前缀匹配，SQLite 可以直接在路径索引上做范围扫描。
+    """
+    return Q(path__gt=path, path__lt=path + PATH_END)
+
+
+def encode_path_segment(comment_id):
+    """将评论 ID 编码为定长路径段"""
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    segment = ''
+    while comment_id:
+        comment_id, remainder = divmod(comment_id, 36)
+        segment = digits[remainder] + segment
+    return segment.rjust(PATH_STEP, '0')
+
 
 class Comment(models.Model):
     """评论模型"""
@@ -22,8 +50,18 @@ class Comment(models.Model):
         related_name='replies',
         verbose_name='父评论'
     )
+    path = models.CharField(
+        max_length=PATH_MAX_LENGTH,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='路径',
+        help_text='由系统根据父评论自动维护'
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级')
     
     is_approved = models.BooleanField(default=True, verbose_name='已审核')
+    likes = models.PositiveIntegerField(default=0, verbose_name='点赞数')
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     
@@ -42,11 +80,52 @@ class Comment(models.Model):
             models.Index(fields=['-created_at']),
             models.Index(fields=['content_type', 'object_id', 'is_approved']),
             models.Index(fields=['author', '-created_at']),
+            models.Index(fields=['content_type', 'object_id', 'path']),
+            models.Index(fields=['path']),
         ]
 
     def __str__(self):
         return f'{self.author.username} 的评论: {self.content[:50]}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 记录加载时的父评论，保存时据此判断是否需要移动子树
+        instance._loaded_parent_id = instance.__dict__.get('parent_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        moved = bool(self.pk and self.path) and self.parent_id != getattr(self, '_loaded_parent_id', self.parent_id)
+        if moved:
+            old_path, old_depth = self.path, self.depth
+            self.path, self.depth = self._build_path()
+            if self.path.startswith(old_path):
+                raise ValueError('不能将评论移动到它自己的回复下')
+        super().save(*args, **kwargs)
+
+        if not self.path:
+            # 路径包含自身 ID，插入后才能确定
+            self.path, self.depth = self._build_path()
+            Comment.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+        elif moved:
+            Comment.objects.filter(Q(path=old_path) | descendants_q(old_path)).update(
+                path=Concat(Value(self.path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (self.depth - old_depth)
+            )
+        self._loaded_parent_id = self.parent_id
+
+    def _build_path(self):
+        """根据父评论计算 (路径, 层级)"""
+        segment = encode_path_segment(self.pk)
+        if self.parent_id is None:
+            return segment, 0
+        parent = self.parent
+        return parent.path + segment, parent.depth + 1
+
+    def get_descendants(self):
+        """获取所有后代评论（按路径排序）"""
+        return Comment.objects.filter(descendants_q(self.path)).order_by('path')
+
     def get_replies(self):
         """获取回复列表"""
         return self.replies.filter(is_approved=True)
@@ -54,7 +133,7 @@ class Comment(models.Model):
 
 class CommentLike(models.Model):
     """评论点赞"""
-    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name='likes')
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name='like_records')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comment_likes')
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -1,39 +1,48 @@
 from rest_framework import serializers
 from django.contrib.contenttypes.models import ContentType
-from .models import Comment, CommentLike
+from .models import Comment, CommentLike, MAX_DEPTH
+from common.likes import LikedListSerializer, LikedSerializerMixin
+from .threads import REPLIES_KEY, REPLY_COUNTS_KEY, count_replies
 from users.serializers import UserPublicSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(LikedSerializerMixin, serializers.ModelSerializer):
     """评论序列化器"""
+    like_model = CommentLike
     author = UserPublicSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(source='likes', read_only=True)
     is_liked = serializers.SerializerMethodField()
+    reply_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
         fields = [
-            'id', 'author', 'content', 'parent', 'replies', 'likes_count',
-            'is_liked', 'is_approved', 'content_type', 'object_id',
+            'id', 'author', 'content', 'parent', 'depth', 'replies', 'reply_count',
+            'likes_count', 'is_liked', 'is_approved', 'content_type', 'object_id',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'depth', 'created_at', 'updated_at']
+        # 加载回复和统计回复数需要路径
+        projection_fields = ['path']
+        list_serializer_class = LikedListSerializer
 
     def get_replies(self, obj):
-        # 优化：避免N+1查询，使用prefetch_related
-        replies = obj.replies.filter(is_approved=True).select_related('author')
+        replies_map = self.context.get(REPLIES_KEY)
+        if replies_map is not None:
+            # 已由 comments.threads 批量加载
+            replies = replies_map.get(obj.id, [])
+        else:
+            replies = obj.replies.filter(is_approved=True).select_related('author')
         serializer = CommentSerializer(replies, many=True, context=self.context)
         return serializer.data
 
-    def get_likes_count(self, obj):
-        return obj.likes.count()
-
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return CommentLike.objects.filter(comment=obj, user=request.user).exists()
-        return False
+    def get_reply_count(self, obj):
+        """后代评论总数（包括因层级限制未返回的回复）"""
+        reply_counts = self.context.get(REPLY_COUNTS_KEY)
+        if reply_counts is not None and obj.id in reply_counts:
+            return reply_counts[obj.id]
+        return count_replies([obj]).get(obj.id, 0)
 
 
 class CommentCreateSerializer(serializers.ModelSerializer):
@@ -42,6 +51,11 @@ class CommentCreateSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ['content', 'parent']
 
+    def validate_parent(self, value):
+        if value is not None and value.depth >= MAX_DEPTH:
+            raise serializers.ValidationError('回复层级过深')
+        return value
+
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
         # 从 context 中获取 content_object
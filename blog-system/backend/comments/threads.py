@@ -0,0 +1,186 @@
+"""
+评论树加载
+
+一次查询取出内容下所有已审核评论，在内存中按父评论分组；
+点赞数读取 Comment.likes 列，当前用户已点赞的评论用一次批量查询获取。
+结果放入序列化上下文，CommentSerializer 从中读取，不再逐条查询。
+
+子树通过物化路径（Comment.path）读取：一棵子树是路径索引上的一段连续范围，
+整棵评论树按路径排序即为先序遍历；按 depth 过滤可以只加载前几层，
+被截断的评论通过 reply_count 告知客户端还有多少回复未加载。
+"""
+from django.db.models import Q
+from common.likes import get_liked_map, liked_context_key
+from .models import Comment, CommentLike, PATH_STEP, descendants_q
+
+REPLIES_KEY = 'comment_replies'
+LIKED_KEY = liked_context_key(CommentLike)
+REPLY_COUNTS_KEY = 'comment_reply_counts'
+# 每次查询合并的子树数（多个子树的范围条件以 OR 连接，需低于 SQLite 表达式深度的限制）
+SUBTREE_BATCH_SIZE = 200
+
+
+def _subtree_conditions(comments, max_depth=None):
+    """
+    一组评论的子树的查询条件
+
+    每棵子树是路径索引上的一段范围，按 SUBTREE_BATCH_SIZE 分批合并为 OR 条件，每批一次查询。
+    不限制层级时，已包含在其他评论子树中的评论不再单独查询。
+
+    Args:
+        max_depth: 相对于各评论最多读取的层级，默认不限制
+
+    Yields:
+        Q: 一批子树的查询条件
+    """
+    comments_by_path = {comment.path: comment for comment in comments if comment.path}
+    terms = []
+    for path in sorted(comments_by_path):
+        comment = comments_by_path[path]
+        if max_depth is None and any(
+            prefix in comments_by_path for prefix in _path_prefixes(path, comment.depth)[:-1]
+        ):
+            continue
+        term = descendants_q(path)
+        if max_depth is not None:
+            term &= Q(depth__lte=comment.depth + max_depth)
+        terms.append(term)
+    for i in range(0, len(terms), SUBTREE_BATCH_SIZE):
+        condition = Q()
+        for term in terms[i:i + SUBTREE_BATCH_SIZE]:
+            condition |= term
+        yield condition
+
+
+def _path_prefixes(path, depth):
+    """路径的各级前缀：第 i 项为 depth = i 的祖先（最后一项为评论自身）的路径"""
+    return [path[:(i + 1) * PATH_STEP] for i in range(depth + 1)]
+
+
+def count_replies(comments):
+    """
+    统计一组评论可见的后代评论数
+
+    未审核评论的整棵子树都不会展示，统计时一并排除。
+    各评论的子树按路径范围读取，在内存中按路径前缀累加。
+
+    Returns:
+        dict: comment_id -> 后代评论数
+    """
+    comments = [comment for comment in comments if comment.path]
+    if not comments:
+        return {}
+    ids_by_path = {comment.path: comment.id for comment in comments}
+    rows = []
+    for condition in _subtree_conditions(comments):
+        rows.extend(Comment.objects.filter(condition).values_list('path', 'depth', 'is_approved'))
+    hidden = {path for path, depth, is_approved in rows if not is_approved}
+
+    counts = {comment.id: 0 for comment in comments}
+    for path, depth, is_approved in rows:
+        prefixes = _path_prefixes(path, depth)
+        # 最深的未审核祖先（含自身）以上的评论看不到这条回复
+        hidden_depth = max((i for i, prefix in enumerate(prefixes) if prefix in hidden), default=-1)
+        for ancestor_depth, prefix in enumerate(prefixes[:-1]):
+            if ancestor_depth >= hidden_depth and prefix in ids_by_path:
+                counts[ids_by_path[prefix]] += 1
+    return counts
+
+
+def _build_context(comments, replies, user, truncated=()):
+    """
+    构建序列化上下文
+
+    Args:
+        comments: 需要序列化的顶层评论
+        replies: 需要展示的回复（已审核）
+        user: 当前用户
+        truncated: 因层级限制未加载回复的评论
+    """
+    replies_map = {}
+    for reply in replies:
+        replies_map.setdefault(reply.parent_id, []).append(reply)
+    # 回复按时间倒序展示
+    for children in replies_map.values():
+        children.sort(key=lambda reply: (reply.created_at, reply.id), reverse=True)
+
+    # 已加载部分在内存中累加，被截断的评论查询数据库
+    reply_counts = count_replies(truncated)
+
+    def subtree_count(comment):
+        if comment.id not in reply_counts:
+            children = replies_map.get(comment.id, [])
+            reply_counts[comment.id] = len(children) + sum(subtree_count(child) for child in children)
+        return reply_counts[comment.id]
+
+    for comment in comments:
+        subtree_count(comment)
+
+    comment_ids = [comment.id for comment in comments] + [reply.id for reply in replies]
+    return {
+        REPLIES_KEY: replies_map,
+        LIKED_KEY: get_liked_map(CommentLike, Comment, user, comment_ids),
+        REPLY_COUNTS_KEY: reply_counts,
+    }
+
+
+def load_thread(content_type_id, object_id, user=None, max_depth=None):
+    """
+    加载内容下的评论树
+
+    Args:
+        max_depth: 最多加载的回复层级（0 表示只加载顶级评论），默认全部加载
+
+    Returns:
+        tuple: (顶级评论列表（按时间正序）, 序列化上下文)
+    """
+    queryset = Comment.objects.filter(
+        content_type_id=content_type_id,
+        object_id=object_id,
+        is_approved=True
+    )
+    if max_depth is not None:
+        queryset = queryset.filter(depth__lte=max_depth)
+    # 按路径排序，使用 (content_type, object_id, path) 索引
+    comments = list(queryset.select_related('author').order_by('path'))
+    replies = [comment for comment in comments if comment.parent_id is not None]
+    # 顶级评论按时间正序展示
+    roots = sorted(
+        (comment for comment in comments if comment.parent_id is None),
+        key=lambda comment: (comment.created_at, comment.id)
+    )
+    truncated = [comment for comment in comments if max_depth is not None and comment.depth == max_depth]
+    return roots, _build_context(roots, replies, user, truncated)
+
+
+def load_replies(comments, user=None, max_depth=None):
+    """
+    为一组评论（如管理员的分页列表、单条评论的回复）加载已审核的回复
+
+    各评论的子树按路径范围读取（分批合并查询），限制层级时同时按 depth 过滤。
+
+    Args:
+        max_depth: 相对于各评论最多加载的回复层级，默认全部加载
+
+    Returns:
+        dict: 序列化上下文
+    """
+    comments = list(comments)
+    comments_by_path = {comment.path: comment for comment in comments if comment.path}
+    replies = {}
+    # max_depth 为 0 时只需要统计回复数，不读取回复
+    for condition in _subtree_conditions(comments_by_path.values() if max_depth != 0 else (), max_depth):
+        queryset = Comment.objects.filter(condition, is_approved=True).select_related('author').order_by('path')
+        # 限制层级时子树可能重叠，按 ID 去重
+        replies.update((reply.id, reply) for reply in queryset)
+    replies = sorted(replies.values(), key=lambda reply: reply.path)
+
+    truncated = [comment for comment in comments if max_depth == 0]
+    if max_depth:
+        for reply in replies:
+            ancestors = (
+                comments_by_path.get(prefix) for prefix in _path_prefixes(reply.path, reply.depth)[:-1]
+            )
+            if any(comment is not None and reply.depth == comment.depth + max_depth for comment in ancestors):
+                truncated.append(reply)
+    return _build_context(comments, replies, user, truncated)
@@ -5,13 +5,22 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from .models import Comment, CommentLike
 from .serializers import CommentSerializer, CommentCreateSerializer
+from .threads import load_thread, load_replies, REPLIES_KEY
+from common.projection import ProjectedListMixin
+from common.likes import toggle_like
+from common.cache import CachedResponseMixin
+from users.models import User
 from common.email import send_comment_reply_notification, send_new_comment_notification
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CachedResponseMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """评论视图集"""
+    cache_models = (Comment, CommentLike, User)
+    cached_actions = ('list', 'retrieve', 'replies')
     queryset = Comment.objects.filter(is_approved=True).select_related('author', 'parent').order_by('created_at')
     permission_classes = [permissions.AllowAny]
+    # 管理员列表键集分页（cursor 参数）的排序，最后一个字段保证唯一
+    cursor_ordering = ('-created_at', '-id')
     # 管理员查看所有评论时启用分页，普通用户查询特定内容评论时不分页
 
     def get_serializer_class(self):
@@ -51,17 +60,45 @@ class CommentViewSet(viewsets.ModelViewSet):
     
     def list(self, request, *args, **kwargs):
         """列表查询，管理员使用分页，普通用户不分页"""
-        queryset = self.get_queryset()
+        queryset = self.project_queryset(self.get_queryset())
         
         # 管理员查看所有评论时使用分页
         if request.user.is_authenticated and request.user.is_staff:
             page = self.paginate_queryset(queryset)
             if page is not None:
-                serializer = self.get_serializer(page, many=True)
+                context = self.get_serializer_context()
+                context.update(load_replies(page, request.user, self._get_max_depth()))
+                serializer = self.get_serializer(page, many=True, context=context)
                 return self.get_paginated_response(serializer.data)
         
-        # 普通用户查询特定内容的评论，不分页
-        serializer = self.get_serializer(queryset, many=True)
+        # 普通用户查询特定内容的评论，不分页（整棵评论树一次加载）
+        content_type_id = request.query_params.get('content_type')
+        object_id = request.query_params.get('object_id')
+        max_depth = self._get_max_depth()
+        context = self.get_serializer_context()
+        if content_type_id and object_id and not request.user.is_staff:
+            comments, thread_context = load_thread(content_type_id, object_id, request.user, max_depth)
+        else:
+            comments = list(queryset)
+            thread_context = load_replies(comments, request.user, max_depth)
+        context.update(thread_context)
+        serializer = self.get_serializer(comments, many=True, context=context)
+        return Response(serializer.data)
+
+    def _get_max_depth(self):
+        """depth 参数：最多返回的回复层级，未指定时返回完整的评论树"""
+        try:
+            return max(0, int(self.request.query_params['depth']))
+        except (KeyError, ValueError):
+            return None
+
+    @action(detail=True, methods=['get'])
+    def replies(self, request, pk=None):
+        """获取评论的回复（用于逐层展开较深的评论树）"""
+        comment = self.get_object()
+        context = self.get_serializer_context()
+        context.update(load_replies([comment], request.user, self._get_max_depth()))
+        serializer = self.get_serializer(context[REPLIES_KEY].get(comment.id, []), many=True, context=context)
         return Response(serializer.data)
 
     def get_permissions(self):
@@ -86,6 +123,9 @@ class CommentViewSet(viewsets.ModelViewSet):
         
         # 保存评论
         comment = serializer.save()
+        if content_object is not None:
+            # 通知邮件使用关联对象，避免重新查询
+            comment.content_object = content_object
         
         # 发送邮件通知（异步处理，避免阻塞请求）
         try:
@@ -135,11 +175,5 @@ class CommentViewSet(viewsets.ModelViewSet):
     def like(self, request, pk=None):
         """点赞评论"""
         comment = self.get_object()
-        like, created = CommentLike.objects.get_or_create(
-            comment=comment,
-            user=request.user
-        )
-        if not created:
-            like.delete()
-            return Response({'liked': False})
-        return Response({'liked': True})
+        liked, likes = toggle_like(CommentLike, comment, request.user)
+        return Response({'liked': liked, 'likes': likes})
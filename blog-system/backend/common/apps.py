@@ -6,3 +6,5 @@ class CommonConfig(AppConfig):
     name = 'common'
     verbose_name = '通用功能'
 
+    def ready(self):
+        from . import signals  # noqa: F401
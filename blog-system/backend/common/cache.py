@@ -0,0 +1,212 @@
+"""
+缓存相关工具函数
+
+使用“版本号（generation）”实现跨进程失效：数据变更时更新共享缓存中的版本号，
+各进程比较本地记录的版本号即可知道缓存是否过期，无需查询数据库。
+
+每个模型有自己的版本号（命名空间 model:<app_label>.<model_name>），
+由 common.signals 在模型保存、删除和多对多关系变化时更新。
+CachedResponseMixin 用这些版本号组成响应缓存的键，相关数据变更后旧的缓存自然不再命中；
+同一组版本号也用作条件请求的 ETag / Last-Modified，客户端缓存未过期时直接返回 304，
+不执行查询和序列化。
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+GENERATION_KEY_PREFIX = 'generation:'
+RESPONSE_KEY_PREFIX = 'response:'
+# 会话中的加密内容验证标记（见 posts.utils.mark_password_verified_in_session）
+VERIFIED_SESSION_PREFIX = 'verified_'
+
+
+def get_generation(namespace):
+    """获取命名空间的当前版本号（不存在时初始化）"""
+    key = f'{GENERATION_KEY_PREFIX}{namespace}'
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def peek_generation(namespace, default=None):
+    """获取命名空间的当前版本号（不存在时返回 default，不初始化）"""
+    return cache.get(f'{GENERATION_KEY_PREFIX}{namespace}', default)
+
+
+def bump_generation(namespace):
+    """使命名空间下的缓存失效（版本号取当前时间，也可作为最后修改时间）"""
+    generation = time.time()
+    cache.set(f'{GENERATION_KEY_PREFIX}{namespace}', generation, timeout=None)
+    return generation
+
+
+def get_generations(namespaces):
+    """批量获取多个命名空间的当前版本号"""
+    keys = {namespace: f'{GENERATION_KEY_PREFIX}{namespace}' for namespace in namespaces}
+    values = cache.get_many(keys.values())
+    generations = {}
+    for namespace, key in keys.items():
+        generation = values.get(key)
+        if generation is None:
+            generation = get_generation(namespace)
+        generations[namespace] = generation
+    return generations
+
+
+def model_namespace(model):
+    """模型版本号的命名空间"""
+    return f'model:{model._meta.label_lower}'
+
+
+def bump_model_generation(model):
+    """模型数据变更后更新其版本号"""
+    return bump_generation(model_namespace(model))
+
+
+def get_validators(models, *parts, period=None):
+    """
+    根据模型版本号生成条件请求的校验值
+
+    Args:
+        models: 内容依赖的模型
+        parts: 区分内容的其他值（如请求地址、查询参数）
+        period: 校验值的最长有效时间（秒），用于不触发信号的字段（如浏览量）
+
+    Returns:
+        tuple: (ETag（未加引号）, 最后修改时间戳)
+    """
+    namespaces = [model_namespace(model) for model in models]
+    generations = get_generations(namespaces)
+    values = [generations[namespace] for namespace in namespaces]
+    if period:
+        values.append(time.time() // period * period)
+    raw = '|'.join([*(str(part) for part in parts), *(repr(value) for value in values)])
+    return hashlib.md5(raw.encode()).hexdigest(), max(values, default=None)
+
+
+def conditional_response(request, etag, last_modified=None):
+    """请求的校验值与 etag / last_modified 一致时返回 304（或 412）响应，否则返回 None"""
+    return get_conditional_response(
+        request,
+        etag=quote_etag(etag),
+        last_modified=int(last_modified) if last_modified else None,
+    )
+
+
+def set_validator_headers(response, etag, last_modified=None):
+    """设置 ETag / Last-Modified 响应头"""
+    response['ETag'] = quote_etag(etag)
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class CachedResponseMixin:
+    """
+    视图集混入：条件请求和匿名用户的响应缓存
+
+    cache_models 声明响应依赖的模型。ETag 由请求地址、排序后的查询参数和这些模型的版本号组成，
+    客户端带 If-None-Match / If-Modified-Since 且内容未变时直接返回 304；
+    匿名用户的响应以 ETag 为键缓存序列化后的数据，渲染仍按每个请求的内容协商进行。
+    cached_actions 中的操作自动生效，其他操作可调用 cached_response。
+
+    登录用户（包括管理员）和验证过加密内容密码的会话看到的内容不同：不使用共享缓存，
+    ETag 中加入用户和验证状态，并且不返回 Last-Modified。
+    浏览量等批量更新的字段不触发信号，ETag 和缓存最多保持 RESPONSE_CACHE_TIMEOUT 秒。
+    """
+    cache_models = ()
+    cached_actions = ('list', 'retrieve')
+
+    def can_cache_response(self, request):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return False
+        session = getattr(request, 'session', None)
+        return not session or not any(key.startswith(VERIFIED_SESSION_PREFIX) for key in session.keys())
+
+    def get_response_validators(self, request, public):
+        """响应的 ETag 和最后修改时间（非公开响应不给出最后修改时间）"""
+        parts = [
+            request.build_absolute_uri(request.path),
+            urlencode(sorted(request.query_params.lists()), doseq=True),
+        ]
+        if not public:
+            session = getattr(request, 'session', None)
+            parts.append(request.user.pk)
+            if session:
+                parts.extend(
+                    f'{key}={value}' for key, value in sorted(session.items())
+                    if key.startswith(VERIFIED_SESSION_PREFIX)
+                )
+        etag, last_modified = get_validators(
+            self.cache_models, *parts, period=getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+        )
+        return etag, last_modified if public else None
+
+    def cached_response(self, request, build):
+        """
+        处理条件请求并返回缓存的响应，未命中时调用 build() 生成
+
+        只缓存状态码为 200 的响应。
+        """
+        public = self.can_cache_response(request)
+        etag, last_modified = self.get_response_validators(request, public)
+        response = conditional_response(request._request, etag, last_modified)
+        if response is None:
+            response = self._get_cached_response(etag, build) if public else build()
+        if response.status_code in (200, 304):
+            set_validator_headers(response, etag, last_modified)
+            # 客户端每次使用前都需重新验证
+            if public:
+                patch_cache_control(response, no_cache=True)
+            else:
+                patch_cache_control(response, no_cache=True, private=True)
+            patch_vary_headers(response, ('Cookie', 'Authorization'))
+        return response
+
+    def _get_cached_response(self, etag, build):
+        key = f'{RESPONSE_KEY_PREFIX}{etag}'
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = build()
+        if response.status_code == 200 and not response.exception:
+            cache.set(key, response.data, timeout=getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.cached_actions:
+            # 认证完成后才能判断是否使用缓存，这里替换本次请求的处理方法
+            method = request.method.lower()
+            handler = getattr(self, method)
+            setattr(self, method, lambda request, *args, **kwargs: self.cached_response(
+                request, lambda: handler(request, *args, **kwargs)
+            ))
+
+
+class ConditionalFeedMixin:
+    """
+    Feed 混入：按模型版本号处理条件请求
+
+    RSS 阅读器定期轮询，内容未变时直接返回 304，不查询文章和生成 XML。
+    与接口的 ETag 一样最多保持 RESPONSE_CACHE_TIMEOUT 秒，不触发信号的写入也会在此之后反映出来。
+    """
+    cache_models = ()
+
+    def __call__(self, request, *args, **kwargs):
+        etag, last_modified = get_validators(
+            self.cache_models, request.build_absolute_uri(), period=getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+        )
+        response = conditional_response(request, etag, last_modified)
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            set_validator_headers(response, etag, last_modified)
+        return response
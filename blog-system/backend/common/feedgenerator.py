@@ -0,0 +1,46 @@
+"""
+JSON Feed 生成器
+
+与 django.utils.feedgenerator 中的 Rss201rev2Feed、Atom1Feed 接口一致，
+可直接作为 Feed 的 feed_type 使用。格式见 https://www.jsonfeed.org/version/1.1/
+"""
+import json
+from django.utils.feedgenerator import SyndicationFeed, rfc3339_date
+
+
+class JsonFeed(SyndicationFeed):
+    """JSON Feed 1.1"""
+    content_type = 'application/feed+json; charset=utf-8'
+    version = 'https://jsonfeed.org/version/1.1'
+
+    def write(self, outfile, encoding):
+        feed = {
+            'version': self.version,
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+        }
+        if self.feed.get('feed_url'):
+            feed['feed_url'] = self.feed['feed_url']
+        if self.feed.get('description'):
+            feed['description'] = self.feed['description']
+        if self.feed.get('language'):
+            feed['language'] = self.feed['language']
+        feed['items'] = [self.item_data(item) for item in self.items]
+        outfile.write(json.dumps(feed, ensure_ascii=False))
+
+    def item_data(self, item):
+        data = {
+            'id': item['unique_id'] or item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_html': item['description'] or '',
+        }
+        if item.get('pubdate'):
+            data['date_published'] = rfc3339_date(item['pubdate'])
+        if item.get('updateddate'):
+            data['date_modified'] = rfc3339_date(item['updateddate'])
+        if item.get('author_name'):
+            data['authors'] = [{'name': item['author_name']}]
+        if item.get('categories'):
+            data['tags'] = list(item['categories'])
+        return data
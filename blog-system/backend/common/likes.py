@@ -0,0 +1,128 @@
+"""
+点赞
+
+文章、瞬间和评论的点赞记录模型结构相同（指向目标的外键 + user，二者联合唯一），
+目标模型上的 likes 列保存点赞数。切换点赞在一个事务内完成：
+删除或插入点赞记录，再用 F() 表达式在数据库中增减计数，并发点赞不会丢失更新。
+
+序列化时的 is_liked 由 LikedSerializerMixin 提供：批量序列化时一次查询整页对象的点赞状态，
+结果以 {目标 ID: 是否已点赞} 的形式放在序列化上下文中，嵌套序列化共用。
+"""
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from rest_framework import serializers
+
+
+def _target_field(like_model, target_model):
+    """点赞记录模型中指向目标模型的外键"""
+    for field in like_model._meta.concrete_fields:
+        if field.is_relation and field.related_model is target_model:
+            return field
+    raise ValueError(f'{like_model.__name__} 没有指向 {target_model.__name__} 的外键')
+
+
+def toggle_like(like_model, target, user):
+    """
+    切换用户对目标的点赞状态
+
+    Args:
+        like_model: 点赞记录模型（如 PostLike）
+        target: 被点赞的对象，模型上需有 likes 计数列
+        user: 当前用户
+
+    Returns:
+        tuple: (是否已点赞, 最新点赞数)
+    """
+    target_model = type(target)
+    field = _target_field(like_model, target_model)
+    lookup = {field.name: target, 'user': user}
+    with transaction.atomic():
+        if like_model.objects.filter(**lookup).delete()[0]:
+            liked, delta = False, -1
+        else:
+            try:
+                with transaction.atomic():
+                    like_model.objects.create(**lookup)
+                liked, delta = True, 1
+            except IntegrityError:
+                # 同一用户的并发请求已插入点赞记录
+                liked, delta = True, 0
+        if delta:
+            target_model.objects.filter(pk=target.pk).update(likes=Greatest(F('likes') + delta, 0))
+        likes = target_model.objects.filter(pk=target.pk).values_list('likes', flat=True).get()
+    target.likes = likes
+    return liked, likes
+
+
+def get_liked_ids(like_model, target_model, user, target_ids):
+    """
+    批量查询用户点赞过的目标
+
+    Returns:
+        set: target_ids 中用户已点赞的 ID
+    """
+    target_ids = set(target_ids)
+    if user is None or not user.is_authenticated or not target_ids:
+        return set()
+    field = _target_field(like_model, target_model)
+    return set(like_model.objects.filter(
+        user=user,
+        **{f'{field.attname}__in': target_ids}
+    ).values_list(field.attname, flat=True))
+
+
+def liked_context_key(like_model):
+    """点赞状态在序列化上下文中的键"""
+    return f'liked:{like_model._meta.label_lower}'
+
+
+def get_liked_map(like_model, target_model, user, target_ids):
+    """批量查询点赞状态，返回 {目标 ID: 是否已点赞}"""
+    target_ids = set(target_ids)
+    liked_ids = get_liked_ids(like_model, target_model, user, target_ids)
+    return {target_id: target_id in liked_ids for target_id in target_ids}
+
+
+class LikedListSerializer(serializers.ListSerializer):
+    """批量序列化前为整页对象一次查询当前用户的点赞状态"""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        self.child.load_liked(items)
+        return super().to_representation(items)
+
+
+class LikedSerializerMixin:
+    """
+    序列化器混入：is_liked 字段的批量解析
+
+    子类设置 like_model，声明 is_liked = serializers.SerializerMethodField()，
+    并在 Meta 中设置 list_serializer_class = LikedListSerializer。
+    """
+    like_model = None
+
+    def _get_liked_map(self):
+        key = liked_context_key(self.like_model)
+        liked = self.context.get(key)
+        if liked is None:
+            liked = {}
+            if isinstance(self.context, dict):
+                self.context[key] = liked
+        return liked
+
+    def load_liked(self, objects):
+        """查询尚未加载点赞状态的对象"""
+        liked = self._get_liked_map()
+        target_ids = [obj.pk for obj in objects if obj.pk not in liked]
+        if target_ids:
+            request = self.context.get('request')
+            user = getattr(request, 'user', None)
+            liked.update(get_liked_map(self.like_model, self.Meta.model, user, target_ids))
+
+    def get_is_liked(self, obj):
+        liked = self._get_liked_map()
+        if obj.pk not in liked:
+            self.load_liked([obj])
+        return liked[obj.pk]
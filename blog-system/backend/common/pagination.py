@@ -0,0 +1,106 @@
+"""
+分页
+
+KeysetPagination 默认按页码分页；请求带 cursor 参数时（首页传空值）改用键集分页：
+按视图的 cursor_ordering 排序，以上一页最后一条记录的排序字段值作为游标，
+用 WHERE 条件定位下一页，不使用 OFFSET，也不统计总数。
+翻到很深的页时查询代价不变，分页期间插入新记录也不会造成重复或遗漏。
+"""
+import base64
+import json
+from collections import OrderedDict
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    页码分页 + 可选的键集分页
+
+    视图通过 cursor_ordering 声明键集排序（如 ('-is_top', '-published_at', '-id')），
+    最后一个字段必须唯一；可为空的字段按空值排在最后处理。
+    cursor_ordering 为空时 cursor 参数无效，始终按页码分页。
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = '无效的游标'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'cursor_ordering', None)
+        self.keyset = bool(ordering) and self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.model = queryset.model
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*[
+            F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+            for field, descending in self.fields
+        ])
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self._after(self._decode_cursor(cursor)))
+
+        # 多取一条判断是否还有下一页
+        results = list(queryset[:page_size + 1])
+        self.page = results[:page_size]
+        self.next_cursor = None
+        if len(results) > page_size:
+            self.next_cursor = self._encode_cursor(self.page[-1])
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def _after(self, values):
+        """排在游标之后的记录：前 i 个字段与游标相等且第 i 个字段排在游标之后"""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, descending), value in zip(self.fields, values):
+            nullable = self.model._meta.get_field(field).null
+            if value is None:
+                # 空值排在最后，该字段上没有排在游标之后的值
+                equal &= Q(**{f'{field}__isnull': True})
+                continue
+            after = Q(**{f'{field}__{"lt" if descending else "gt"}': value})
+            if nullable:
+                after |= Q(**{f'{field}__isnull': True})
+            condition |= equal & after
+            equal &= Q(**{field: value})
+        return condition
+
+    def _encode_cursor(self, obj):
+        values = [
+            None if getattr(obj, field) is None else self.model._meta.get_field(field).value_to_string(obj)
+            for field, _ in self.fields
+        ]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def _decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError(cursor)
+            return [
+                None if value is None else self.model._meta.get_field(field).to_python(value)
+                for (field, _), value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
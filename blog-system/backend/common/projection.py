@@ -0,0 +1,177 @@
+"""
+按序列化器字段投影查询集
+
+根据序列化器声明的字段推导查询计划：
+- 普通字段和外键只加载对应的列（only）；
+- 嵌套序列化的外键使用 select_related，并只加载嵌套序列化器需要的列；
+- 多对多和反向外键使用 Prefetch，预取查询同样按嵌套序列化器投影。
+
+SerializerMethodField 等无法推导的字段，通过序列化器 Meta.projection_fields
+声明需要额外加载的模型字段（可使用 author__username 形式的路径）。
+来源无法识别的字段（如模型属性）会使该层放弃列投影，加载全部列，保证结果正确。
+"""
+from collections import namedtuple
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+Projection = namedtuple('Projection', ['columns', 'unknown', 'select_related', 'prefetches'])
+# 预取计划：路径、关联模型、需要加载的列（None 表示全部）、关联模型的 select_related 与嵌套预取
+PrefetchPlan = namedtuple('PrefetchPlan', ['path', 'model', 'columns', 'select_related', 'prefetches'])
+
+_projections = {}
+
+
+def _nested_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+def _plan(serializer, model):
+    """
+    推导一个序列化器在指定模型上的查询计划
+
+    Returns:
+        Projection: columns 为需要加载的列，unknown 为无法识别的来源属性
+    """
+    columns = {model._meta.pk.name}
+    unknown = set()
+    select_related = set()
+    prefetches = []
+    for field_path in getattr(getattr(serializer, 'Meta', None), 'projection_fields', ()):
+        columns.add(field_path)
+        if '__' in field_path:
+            select_related.add(field_path.rsplit('__', 1)[0])
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            # SerializerMethodField 需要的字段由 Meta.projection_fields 声明
+            if not isinstance(field, serializers.SerializerMethodField):
+                unknown.add('*')
+            continue
+        attrs = field.source_attrs
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            unknown.add(attrs[0])
+            continue
+        nested = _nested_serializer(field)
+
+        if not model_field.is_relation:
+            columns.add(model_field.name)
+        elif not model_field.concrete:
+            if not (model_field.one_to_many or model_field.many_to_many) or model_field.related_model is None:
+                # 反向一对一、GenericForeignKey 等
+                unknown.add(attrs[0])
+                continue
+            prefetches.append(_prefetch_plan(model_field, attrs, nested))
+        elif model_field.many_to_many:
+            prefetches.append(_prefetch_plan(model_field, attrs, nested))
+        elif nested is not None:
+            # 嵌套序列化的外键：select_related 并投影关联模型的列
+            related = _plan(nested, model_field.related_model)
+            select_related.add(model_field.name)
+            select_related.update(f'{model_field.name}__{path}' for path in related.select_related)
+            if related.unknown:
+                columns.add(model_field.name)
+            else:
+                columns.update(f'{model_field.name}__{column}' for column in related.columns)
+            prefetches.extend(
+                plan._replace(path=f'{model_field.name}__{plan.path}') for plan in related.prefetches
+            )
+        elif len(attrs) > 1:
+            # author.username 形式的来源
+            select_related.add(model_field.name)
+            columns.add(model_field.name)
+        else:
+            # 只输出主键（PrimaryKeyRelatedField）
+            columns.add(model_field.name)
+    return Projection(columns, unknown, select_related, prefetches)
+
+
+def _prefetch_plan(model_field, attrs, nested):
+    related_model = model_field.related_model
+    if nested is None:
+        return PrefetchPlan(attrs[0], related_model, None if len(attrs) > 1 else set(), set(), [])
+    related = _plan(nested, related_model)
+    columns = None if related.unknown else set(related.columns)
+    if columns is not None and model_field.one_to_many:
+        # 反向外键预取需要指回主表的外键列
+        columns.add(model_field.field.name)
+    return PrefetchPlan(attrs[0], related_model, columns, related.select_related, related.prefetches)
+
+
+def get_projection(serializer_class):
+    """获取序列化器的查询计划（按序列化器类缓存）"""
+    projection = _projections.get(serializer_class)
+    if projection is None:
+        projection = _projections[serializer_class] = _plan(serializer_class(), serializer_class.Meta.model)
+    return projection
+
+
+def _build_prefetch(plan, existing=None):
+    queryset = existing if existing is not None else plan.model._default_manager.all()
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    if plan.columns is not None:
+        queryset = queryset.only(*(plan.columns | {plan.model._meta.pk.name}))
+    if plan.prefetches:
+        queryset = queryset.prefetch_related(*(_build_prefetch(nested) for nested in plan.prefetches))
+    return Prefetch(plan.path, queryset=queryset)
+
+
+def project_queryset(queryset, serializer_class):
+    """
+    按序列化器字段投影查询集
+
+    查询集上已有的 Prefetch（如指定了排序的预取查询）会保留其查询集并在其上投影；
+    投影列时，序列化器不需要的 select_related 会被移除。
+    """
+    projection = get_projection(serializer_class)
+    existing = {}
+    for lookup in queryset._prefetch_related_lookups:
+        if isinstance(lookup, Prefetch):
+            existing[lookup.prefetch_to] = lookup.queryset
+        else:
+            existing[lookup] = None
+    planned = {plan.path for plan in projection.prefetches}
+
+    queryset = queryset.prefetch_related(None)
+    # 注解（annotate）提供的字段不是未知来源
+    unknown = projection.unknown - set(queryset.query.annotations)
+    if not unknown:
+        # 未投影的关联不能同时 select_related，一并替换为计划中的关联
+        queryset = queryset.select_related(None).only(*projection.columns)
+    if projection.select_related:
+        queryset = queryset.select_related(*projection.select_related)
+    prefetches = [_build_prefetch(plan, existing.get(plan.path)) for plan in projection.prefetches]
+    # 保留序列化器之外用到的预取
+    prefetches.extend(
+        Prefetch(path, queryset=existing_queryset) if existing_queryset is not None else path
+        for path, existing_queryset in existing.items() if path not in planned
+    )
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset
+
+
+class ProjectedListMixin:
+    """
+    视图集混入：列表接口按序列化器字段投影查询集
+
+    使用 ListModelMixin.list 的视图集自动生效；自定义 list 的视图集调用 project_queryset。
+    """
+
+    def project_queryset(self, queryset, serializer_class=None):
+        return project_queryset(queryset, serializer_class or self.get_serializer_class())
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = self.project_queryset(queryset)
+        return queryset
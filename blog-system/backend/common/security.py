@@ -7,6 +7,26 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.html import escape
 
+# 默认允许的标签和属性
+DEFAULT_ALLOWED_TAGS = [
+    'p', 'br', 'strong', 'em', 'u', 'i', 'b', 'span', 'div',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'ul', 'ol', 'li', 'blockquote', 'pre', 'code',
+    'a', 'img', 'table', 'thead', 'tbody', 'tr', 'th', 'td'
+]
+
+DEFAULT_ALLOWED_ATTRIBUTES = {
+    '*': ['class'],
+    'a': ['href', 'title', 'target'],
+    'img': ['src', 'alt', 'title', 'width', 'height'],
+    'blockquote': ['cite'],
+    'code': ['class'],
+    'pre': ['class']
+}
+
+# 链接允许的协议（相对地址始终允许）
+ALLOWED_PROTOCOLS = ['http', 'https', 'mailto']
+
 
 def sanitize_html(content: str, allowed_tags: list = None, allowed_attributes: dict = None) -> str:
     """
@@ -23,31 +43,15 @@ def sanitize_html(content: str, allowed_tags: list = None, allowed_attributes: d
     if not content:
         return ''
     
-    # 默认允许的标签和属性
-    default_tags = [
-        'p', 'br', 'strong', 'em', 'u', 'i', 'b', 'span', 'div',
-        'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-        'ul', 'ol', 'li', 'blockquote', 'pre', 'code',
-        'a', 'img', 'table', 'thead', 'tbody', 'tr', 'th', 'td'
-    ]
-    
-    default_attributes = {
-        '*': ['class'],
-        'a': ['href', 'title', 'target'],
-        'img': ['src', 'alt', 'title', 'width', 'height'],
-        'blockquote': ['cite'],
-        'code': ['class'],
-        'pre': ['class']
-    }
-    
-    tags = allowed_tags or default_tags
-    attributes = allowed_attributes or default_attributes
+    tags = allowed_tags or DEFAULT_ALLOWED_TAGS
+    attributes = allowed_attributes or DEFAULT_ALLOWED_ATTRIBUTES
     
     # 使用bleach清理HTML
     cleaned = bleach.clean(
         content,
         tags=tags,
         attributes=attributes,
+        protocols=ALLOWED_PROTOCOLS,
         strip=True
     )
     
@@ -0,0 +1,32 @@
+"""
+模型版本号的信号处理
+
+项目内模型保存、删除或多对多关系变化时更新该模型的版本号（见 common.cache）。
+queryset.update() 不触发信号：评论审核、评论数、文章数、渲染结果等批量更新后手动调用 bump_model_generation；
+浏览量和热度分等计数器依赖缓存过期时间刷新。
+"""
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .cache import bump_model_generation
+
+
+def _is_project_model(model):
+    # Django 自带应用（会话、后台日志等）的写入与业务数据无关
+    return not model.__module__.startswith('django.')
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_generation_on_change(sender, **kwargs):
+    """模型保存或删除后更新版本号"""
+    if _is_project_model(sender):
+        bump_model_generation(sender)
+
+
+@receiver(m2m_changed)
+def bump_generation_on_m2m_changed(sender, instance, action, model, **kwargs):
+    """多对多关系变化后更新两端模型的版本号"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        for changed in {type(instance), model}:
+            if _is_project_model(changed):
+                bump_model_generation(changed)
@@ -1,10 +1,12 @@
 from rest_framework import viewsets, permissions
 from .models import LinkCategory, Link
 from .serializers import LinkCategorySerializer, LinkSerializer
+from common.cache import CachedResponseMixin
 
 
-class LinkCategoryViewSet(viewsets.ModelViewSet):
+class LinkCategoryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """友链分类视图集"""
+    cache_models = (LinkCategory, Link)
     serializer_class = LinkCategorySerializer
     permission_classes = [permissions.AllowAny]
     pagination_class = None  # 禁用分页，直接返回数组
@@ -43,8 +45,9 @@ class LinkCategoryViewSet(viewsets.ModelViewSet):
         return response
 
 
-class LinkViewSet(viewsets.ModelViewSet):
+class LinkViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """友链视图集"""
+    cache_models = (LinkCategory, Link)
     queryset = Link.objects.all().select_related('category')
     serializer_class = LinkSerializer
     permission_classes = [permissions.AllowAny]
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from .models import Moment, MomentLike
 from users.serializers import UserPublicSerializer
+from common.likes import LikedListSerializer, LikedSerializerMixin
 
 
-class MomentSerializer(serializers.ModelSerializer):
+class MomentSerializer(LikedSerializerMixin, serializers.ModelSerializer):
     """瞬间序列化器"""
+    like_model = MomentLike
     author = UserPublicSerializer(read_only=True)
     likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
@@ -17,16 +19,12 @@ class MomentSerializer(serializers.ModelSerializer):
             'published_at', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'likes_count', 'comments_count', 'created_at', 'updated_at']
+        projection_fields = ['likes']
+        list_serializer_class = LikedListSerializer
 
     def get_likes_count(self, obj):
         return obj.likes
 
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return MomentLike.objects.filter(moment=obj, user=request.user).exists()
-        return False
-
 
 class MomentCreateSerializer(serializers.ModelSerializer):
     """瞬间创建序列化器"""
@@ -4,12 +4,19 @@ from rest_framework.response import Response
 from django.db.models import Q
 from .models import Moment, MomentLike
 from .serializers import MomentSerializer, MomentCreateSerializer
+from common.projection import ProjectedListMixin
+from common.likes import toggle_like
+from common.cache import CachedResponseMixin
+from users.models import User
 
 
-class MomentViewSet(viewsets.ModelViewSet):
+class MomentViewSet(CachedResponseMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """瞬间视图集"""
+    cache_models = (Moment, MomentLike, User)
     queryset = Moment.objects.filter(visibility='public').select_related('author')
     permission_classes = [permissions.AllowAny]
+    # 键集分页（cursor 参数）的排序，最后一个字段保证唯一
+    cursor_ordering = ('-published_at', '-id')
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -34,16 +41,5 @@ class MomentViewSet(viewsets.ModelViewSet):
     def like(self, request, pk=None):
         """点赞瞬间"""
         moment = self.get_object()
-        like, created = MomentLike.objects.get_or_create(
-            moment=moment,
-            user=request.user
-        )
-        if not created:
-            like.delete()
-            moment.likes = max(0, moment.likes - 1)
-            liked = False
-        else:
-            moment.likes += 1
-            liked = True
-        moment.save(update_fields=['likes'])
-        return Response({'liked': liked, 'likes': moment.likes})
+        liked, likes = toggle_like(MomentLike, moment, request.user)
+        return Response({'liked': liked, 'likes': likes})
@@ -37,6 +37,13 @@ class MusicSerializer(serializers.ModelSerializer):
         return None
 
 
+class MusicListSerializer(MusicSerializer):
+    """音乐列表序列化器（不含歌词）"""
+
+    class Meta(MusicSerializer.Meta):
+        fields = [field for field in MusicSerializer.Meta.fields if field != 'lyrics']
+
+
 class MusicCreateSerializer(serializers.ModelSerializer):
     """音乐创建序列化器"""
     class Meta:
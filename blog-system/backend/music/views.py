@@ -3,17 +3,22 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q
 from .models import Music
-from .serializers import MusicSerializer, MusicCreateSerializer
+from .serializers import MusicSerializer, MusicListSerializer, MusicCreateSerializer
+from common.projection import ProjectedListMixin
+from common.cache import CachedResponseMixin
 
 
-class MusicViewSet(viewsets.ModelViewSet):
+class MusicViewSet(CachedResponseMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """音乐视图集"""
+    cache_models = (Music,)
     permission_classes = [permissions.AllowAny]
     pagination_class = None  # 禁用分页，直接返回数组
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return MusicCreateSerializer
+        if self.action == 'list':
+            return MusicListSerializer
         return MusicSerializer
 
     def get_permissions(self):
@@ -33,7 +38,7 @@ class MusicViewSet(viewsets.ModelViewSet):
     
     def list(self, request, *args, **kwargs):
         """获取音乐列表"""
-        queryset = self.get_queryset()
+        queryset = self.project_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
     
@@ -60,6 +60,15 @@ class AlbumSerializer(serializers.ModelSerializer):
         return data
 
 
+class AlbumListSerializer(AlbumSerializer):
+    """相册列表序列化器（不含照片，照片数由查询注解提供）"""
+    photos_count = serializers.IntegerField(read_only=True)
+
+    class Meta(AlbumSerializer.Meta):
+        fields = [field for field in AlbumSerializer.Meta.fields if field != 'photos']
+        projection_fields = ['password_updated_at']
+
+
 class AlbumCreateSerializer(serializers.ModelSerializer):
     """相册创建序列化器"""
     class Meta:
@@ -2,13 +2,14 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import models
-from django.db.models import Q
+from django.db.models import Q, Count
 from .models import Album, Photo
-from .serializers import AlbumSerializer, AlbumCreateSerializer, PhotoSerializer
+from .serializers import AlbumSerializer, AlbumListSerializer, AlbumCreateSerializer, PhotoSerializer
 from .utils import verify_content_password, mark_password_verified_in_session
+from common.projection import ProjectedListMixin
 
 
-class AlbumViewSet(viewsets.ModelViewSet):
+class AlbumViewSet(ProjectedListMixin, viewsets.ModelViewSet):
     """相册视图集"""
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
@@ -16,6 +17,8 @@ class AlbumViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return AlbumCreateSerializer
+        if self.action == 'list':
+            return AlbumListSerializer
         return AlbumSerializer
 
     def get_permissions(self):
@@ -25,9 +28,14 @@ class AlbumViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """优化查询，确保照片按顺序返回，支持搜索"""
-        queryset = Album.objects.all().select_related('author').prefetch_related(
-            models.Prefetch('photos', queryset=Photo.objects.order_by('order', '-created_at'))
-        )
+        queryset = Album.objects.all().select_related('author')
+        if self.action == 'list':
+            # 列表不返回照片，只统计数量（分组查询不会应用 Meta.ordering，需显式排序）
+            queryset = queryset.annotate(photos_count=Count('photos')).order_by(*Album._meta.ordering)
+        else:
+            queryset = queryset.prefetch_related(
+                models.Prefetch('photos', queryset=Photo.objects.order_by('order', '-created_at'))
+            )
         
         # 搜索功能
         search = self.request.query_params.get('search', None)
@@ -0,0 +1,104 @@
+"""
+文章归档
+
+按月分组由数据库完成（TruncMonth），每篇文章只读取归档页需要的字段。
+公开归档（仅已发布文章）缓存在共享缓存中，键中带版本号，
+文章发布、撤回、修改标题等操作通过信号更新版本号使缓存失效。
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import Coalesce, TruncMonth, ExtractYear
+from rest_framework import serializers
+from common.cache import get_generation, bump_generation
+
+GENERATION_NAMESPACE = 'post_archives'
+# 影响归档内容的字段，仅这些字段变化时才需要使缓存失效
+ARCHIVE_FIELDS = {'title', 'slug', 'status', 'published_at', 'created_at'}
+
+_datetime_field = serializers.DateTimeField()
+
+
+def invalidate_archives():
+    """使归档缓存失效"""
+    bump_generation(GENERATION_NAMESPACE)
+
+
+def _annotate(queryset):
+    """归档日期：发布时间，未发布时取创建时间"""
+    return queryset.order_by().annotate(
+        archive_date=Coalesce('published_at', 'created_at')
+    ).annotate(
+        archive_month=TruncMonth('archive_date'),
+        archive_year=ExtractYear('archive_date'),
+    )
+
+
+def _public_queryset():
+    from .models import Post
+    return Post.objects.filter(status='published')
+
+
+def _cached(key, build):
+    cache_key = f'{GENERATION_NAMESPACE}:{get_generation(GENERATION_NAMESPACE)}:{key}'
+    result = cache.get(cache_key)
+    if result is None:
+        result = build()
+        cache.set(cache_key, result, timeout=getattr(settings, 'POST_ARCHIVE_CACHE_TIMEOUT', 3600))
+    return result
+
+
+def build_archives(queryset, year=None):
+    """
+    按月分组文章
+
+    Args:
+        queryset: 文章查询集
+        year: 只返回指定年份的文章
+
+    Returns:
+        dict: "YYYY-MM" -> [{id, title, slug, published_at, created_at}]，按时间倒序
+    """
+    queryset = _annotate(queryset)
+    if year is not None:
+        queryset = queryset.filter(archive_year=year)
+    rows = queryset.order_by('-archive_date', '-id').values_list(
+        'id', 'title', 'slug', 'published_at', 'created_at', 'archive_month'
+    )
+    archives = {}
+    for post_id, title, slug, published_at, created_at, month in rows:
+        archives.setdefault(f'{month.year}-{month.month:02d}', []).append({
+            'id': post_id,
+            'title': title,
+            'slug': slug,
+            'published_at': _datetime_field.to_representation(published_at) if published_at else None,
+            'created_at': _datetime_field.to_representation(created_at),
+        })
+    return archives
+
+
+def build_archive_months(queryset):
+    """
+    统计每月的文章数
+
+    Returns:
+        list: [{'month': 'YYYY-MM', 'count': 文章数}]，按时间倒序
+    """
+    rows = _annotate(queryset).values('archive_month').annotate(
+        count=Count('id')
+    ).order_by('-archive_month').values_list('archive_month', 'count')
+    return [{'month': f'{month.year}-{month.month:02d}', 'count': count} for month, count in rows]
+
+
+def get_archives(queryset=None, year=None):
+    """获取归档（未指定查询集时返回带缓存的公开归档）"""
+    if queryset is not None:
+        return build_archives(queryset, year)
+    return _cached(f'posts:{year or "all"}', lambda: build_archives(_public_queryset(), year))
+
+
+def get_archive_months(queryset=None):
+    """获取每月文章数（未指定查询集时返回带缓存的公开统计）"""
+    if queryset is not None:
+        return build_archive_months(queryset)
+    return _cached('months', lambda: build_archive_months(_public_queryset()))
@@ -0,0 +1,132 @@
+"""
+文章浏览量计数
+
+浏览先在缓存中按 (文章, IP) 去重，增量累积在进程内存中，
+再定期批量写入数据库：一条 UPDATE 语句更新所有文章的浏览量，
+浏览记录通过 bulk_create 一次写入，避免每次请求都占用 SQLite 写锁。
+"""
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Case, When, Value, PositiveIntegerField
+from .hot import refresh_hot_scores
+
+logger = logging.getLogger(__name__)
+
+# 连续写入失败的次数达到该值时丢弃缓冲的数据
+MAX_FLUSH_ATTEMPTS = 3
+
+
+class ViewCounter:
+    """浏览量缓冲计数器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # post_id -> 待写入的浏览量增量
+        self._records = []  # 待写入的 PostView
+        self._timer = None
+        self._failures = 0  # 连续写入失败的次数
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'POST_VIEW_FLUSH_INTERVAL', 10)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'POST_VIEW_FLUSH_BATCH_SIZE', 500)
+
+    @property
+    def dedupe_window(self):
+        return getattr(settings, 'POST_VIEW_DEDUPE_WINDOW', 3600)
+
+    def record(self, post_id, ip_address, user_agent=''):
+        """
+        记录一次浏览
+
+        Returns:
+            bool: 是否计入浏览量（同一 IP 在去重窗口内重复浏览返回 False）
+        """
+        from .models import PostView
+
+        # cache.add 是原子操作，键已存在时返回 False
+        if not cache.add(f'post_view:{post_id}:{ip_address}', 1, timeout=self.dedupe_window):
+            return False
+
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0) + 1
+            self._records.append(PostView(post_id=post_id, ip_address=ip_address, user_agent=user_agent))
+            should_flush = len(self._records) >= self.batch_size
+            if not should_flush and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if should_flush:
+            self.flush()
+        return True
+
+    def pending_views(self, post_id):
+        """获取尚未写入数据库的浏览量增量"""
+        return self._pending.get(post_id, 0)
+
+    def flush(self):
+        """将缓冲的浏览量写入数据库"""
+        from .models import Post, PostView
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            records, self._records = self._records, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return
+
+        try:
+            with transaction.atomic():
+                # 文章可能在缓冲期间被删除，其浏览记录永远无法写入（外键约束），直接丢弃
+                existing = set(Post.objects.filter(pk__in=pending.keys()).values_list('pk', flat=True))
+                dropped = len(pending) - len(existing)
+                if dropped:
+                    logger.info(f'{dropped} 篇文章已删除，丢弃其未写入的浏览量')
+                    pending = {post_id: count for post_id, count in pending.items() if post_id in existing}
+                    records = [view for view in records if view.post_id in existing]
+                if pending:
+                    Post.objects.filter(pk__in=pending.keys()).update(
+                        views=F('views') + Case(
+                            *[When(pk=post_id, then=Value(count)) for post_id, count in pending.items()],
+                            default=Value(0),
+                            output_field=PositiveIntegerField()
+                        )
+                    )
+                    refresh_hot_scores(pending.keys())
+                    PostView.objects.bulk_create(records, batch_size=self.batch_size)
+            self._failures = 0
+        except Exception as e:
+            self._failures += 1
+            if self._failures >= MAX_FLUSH_ATTEMPTS:
+                # 连续多次失败时放弃这批数据，避免缓冲区无限增长
+                logger.error(f'写入浏览量连续失败 {self._failures} 次，丢弃 {len(records)} 条浏览记录：{e}', exc_info=True)
+                self._failures = 0
+                return
+            logger.error(f'写入浏览量失败，将在下次重试：{e}', exc_info=True)
+            with self._lock:
+                for post_id, count in pending.items():
+                    self._pending[post_id] = self._pending.get(post_id, 0) + count
+                self._records = records + self._records
+
+    def _flush_in_background(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            # 后台线程使用独立的数据库连接，用完关闭
+            connection.close()
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
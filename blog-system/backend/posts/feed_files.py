@@ -0,0 +1,181 @@
+"""
+预生成的 Feed 文件
+
+文章、评论等变更后，在后台把主 Feed、各分类 Feed 和评论 Feed（RSS、Atom、JSON Feed）写入 FEED_ROOT，
+目录结构与 URL 一致（如 /feed/atom/ 对应 feed/atom/index.xml），由前端代理直接作为静态文件提供。
+
+变更发生时先删除受影响的文件并更新版本号，代理在重新生成前转发给 Django 动态生成；
+Feed 视图在文件存在且生成时间不早于版本号时直接返回文件。
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import FileResponse, HttpRequest
+from django.urls import resolve, reverse
+from common.cache import peek_generation, bump_generation
+
+logger = logging.getLogger(__name__)
+
+GENERATION_NAMESPACE = 'feed_files'
+# 各类 Feed 的 URL 名称，分类 Feed 按分类逐个生成
+FEED_URL_NAMES = {
+    'posts': ('posts-feed', 'posts-feed-atom', 'posts-feed-json'),
+    'comments': ('comments-feed', 'comments-feed-atom', 'comments-feed-json'),
+}
+CATEGORY_FEED_URL_NAMES = ('category-feed', 'category-feed-atom', 'category-feed-json')
+
+
+def _namespace(kind):
+    return f'{GENERATION_NAMESPACE}:{kind}'
+
+
+def feed_file_path(path, file_name):
+    """URL 路径对应的 Feed 文件"""
+    return os.path.join(settings.FEED_ROOT, path.strip('/'), file_name)
+
+
+def get_feed_file(path, file_name, kind):
+    """返回可用的 Feed 文件路径，文件不存在或早于最近一次变更时返回 None"""
+    file_path = feed_file_path(path, file_name)
+    try:
+        modified = os.stat(file_path).st_mtime
+    except OSError:
+        return None
+    if modified < peek_generation(_namespace(kind), 0):
+        return None
+    return file_path
+
+
+class _FeedRequest(HttpRequest):
+    """生成文件时使用的请求，Feed 自身的地址使用 FEED_SITE_URL"""
+
+    def __init__(self, path):
+        super().__init__()
+        site = urlsplit(settings.FEED_SITE_URL)
+        self.path = self.path_info = path
+        self._scheme = site.scheme or 'http'
+        self._host = site.netloc
+
+    def _get_scheme(self):
+        return self._scheme
+
+    def get_host(self):
+        return self._host
+
+
+def _feed_paths(kind):
+    paths = [reverse(name) for name in FEED_URL_NAMES[kind]]
+    if kind == 'posts':
+        from categories.models import Category
+        for slug in Category.objects.values_list('slug', flat=True):
+            paths.extend(reverse(name, kwargs={'slug': slug}) for name in CATEGORY_FEED_URL_NAMES)
+    return paths
+
+
+def write_feed_file(path, generated_at):
+    """生成一个 Feed 文件（先写临时文件再替换，代理不会读到写了一半的文件）"""
+    request = _FeedRequest(path)
+    match = resolve(path)
+    feed = match.func
+    obj = feed.get_object(request, *match.args, **match.kwargs)
+    content = feed.get_feed(obj, request).writeString('utf-8')
+
+    file_path = feed_file_path(path, feed.file_name)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temp_path = f'{file_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    # 文件时间记为开始生成的时间，生成期间发生的变更会使它失效
+    os.utime(temp_path, (generated_at, generated_at))
+    os.replace(temp_path, file_path)
+
+
+def build_feed_files(kinds=tuple(FEED_URL_NAMES)):
+    """生成指定类别的全部 Feed 文件，返回生成的文件数（单个 Feed 失败不影响其他 Feed）"""
+    count = 0
+    for kind in kinds:
+        generated_at = time.time()
+        for path in _feed_paths(kind):
+            try:
+                write_feed_file(path, generated_at)
+                count += 1
+            except Exception as e:
+                logger.error(f'生成 Feed 文件失败（{path}）：{e}', exc_info=True)
+    return count
+
+
+def _remove_feed_files(kind):
+    for name in FEED_URL_NAMES[kind]:
+        path = reverse(name)
+        file_name = resolve(path).func.file_name
+        try:
+            os.remove(feed_file_path(path, file_name))
+        except FileNotFoundError:
+            pass
+    if kind == 'posts':
+        # 分类可能被删除或改名，整个目录重新生成
+        category_root = os.path.join(settings.FEED_ROOT, 'feed', 'category')
+        shutil.rmtree(category_root, ignore_errors=True)
+
+
+def invalidate_feed_files(*kinds):
+    """数据变更后删除受影响的 Feed 文件，并在事务提交后安排重新生成"""
+    for kind in kinds:
+        bump_generation(_namespace(kind))
+        _remove_feed_files(kind)
+    transaction.on_commit(lambda: schedule_feed_rebuild(kinds))
+
+
+_pending_kinds = set()
+_pending_timer = None
+_pending_lock = threading.Lock()
+
+
+def schedule_feed_rebuild(kinds):
+    """延迟在后台重新生成 Feed 文件（短时间内多次变更只生成一次）"""
+    global _pending_timer
+    with _pending_lock:
+        _pending_kinds.update(kinds)
+        if _pending_timer is not None:
+            _pending_timer.cancel()
+        _pending_timer = threading.Timer(getattr(settings, 'FEED_REBUILD_DELAY', 2), _run_rebuild)
+        _pending_timer.daemon = True
+        _pending_timer.start()
+
+
+def _run_rebuild():
+    global _pending_timer
+    with _pending_lock:
+        kinds = tuple(_pending_kinds)
+        _pending_kinds.clear()
+        _pending_timer = None
+    try:
+        build_feed_files(kinds)
+    finally:
+        # 后台线程使用独立的数据库连接，用完关闭
+        connection.close()
+
+
+class StaticFeedMixin:
+    """
+    Feed 混入：优先返回预生成的文件
+
+    feed_kind 为文件所属的类别（决定失效范围），file_name 为文件名。
+    """
+    feed_kind = 'posts'
+    file_name = 'index.xml'
+
+    def __call__(self, request, *args, **kwargs):
+        file_path = get_feed_file(request.path_info, self.file_name, self.feed_kind)
+        if file_path is not None:
+            try:
+                return FileResponse(open(file_path, 'rb'), content_type=self.feed_type.content_type)
+            except OSError:
+                # 文件刚被删除
+                pass
+        return super().__call__(request, *args, **kwargs)
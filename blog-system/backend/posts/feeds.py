@@ -1,19 +1,41 @@
 """
 RSS Feed 定义
+
+每个 Feed 有 RSS、Atom 和 JSON Feed 三种格式，优先返回预生成的文件（见 feed_files）。
 """
 from django.contrib.syndication.views import Feed
 from django.urls import reverse
-from django.utils.feedgenerator import Rss201rev2Feed
+from django.utils.feedgenerator import Rss201rev2Feed, Atom1Feed
 from django.conf import settings
 from .models import Post
+from .feed_files import StaticFeedMixin
 from settings.models import SiteSettings
+from categories.models import Category
+from tags.models import Tag
+from common.cache import ConditionalFeedMixin
+from common.feedgenerator import JsonFeed
 
 
-class PostsFeed(Feed):
+class PostsFeed(ConditionalFeedMixin, StaticFeedMixin, Feed):
     """文章 RSS Feed"""
+    cache_models = (Post, Category, Tag, SiteSettings)
     feed_type = Rss201rev2Feed
-    title = "博客文章"
-    description = "最新发布的博客文章"
+    feed_kind = 'posts'
+    
+    def title(self):
+        """Feed 标题（站点名称）"""
+        try:
+            site_settings = SiteSettings.get_settings()
+            return f"{site_settings.site_name} - 最新文章"
+        except Exception:
+            return "博客文章"
+    
+    def description(self):
+        """Feed 描述（站点描述）"""
+        try:
+            return SiteSettings.get_settings().site_description or "最新发布的博客文章"
+        except Exception:
+            return "最新发布的博客文章"
     
     def link(self, request=None):
         """Feed 链接（前端 URL）"""
@@ -30,16 +52,6 @@ class PostsFeed(Feed):
                 frontend_url = f"{scheme}://{host}"
         return frontend_url or 'http://localhost:5173'
     
-    def __init__(self):
-        super().__init__()
-        # 获取站点设置
-        try:
-            site_settings = SiteSettings.get_settings()
-            self.title = f"{site_settings.site_name} - 最新文章"
-            self.description = site_settings.site_description or "最新发布的博客文章"
-        except Exception:
-            pass
-    
     def items(self):
         """返回最新的已发布文章（不包含加密文章）"""
         return Post.objects.filter(
@@ -88,9 +100,11 @@ class PostsFeed(Feed):
         return categories
 
 
-class CategoryPostsFeed(Feed):
+class CategoryPostsFeed(ConditionalFeedMixin, StaticFeedMixin, Feed):
     """分类文章 RSS Feed"""
+    cache_models = (Post, Category, Tag, SiteSettings)
     feed_type = Rss201rev2Feed
+    feed_kind = 'posts'
     
     def get_object(self, request, slug):
         """获取分类对象"""
@@ -153,3 +167,24 @@ class CategoryPostsFeed(Feed):
         categories.extend([tag.name for tag in item.tags.all()])
         return categories
 
+
+class AtomPostsFeed(PostsFeed):
+    """文章 Atom Feed"""
+    feed_type = Atom1Feed
+
+
+class JsonPostsFeed(PostsFeed):
+    """文章 JSON Feed"""
+    feed_type = JsonFeed
+    file_name = 'index.json'
+
+
+class AtomCategoryPostsFeed(CategoryPostsFeed):
+    """分类文章 Atom Feed"""
+    feed_type = Atom1Feed
+
+
+class JsonCategoryPostsFeed(CategoryPostsFeed):
+    """分类文章 JSON Feed"""
+    feed_type = JsonFeed
+    file_name = 'index.json'
@@ -0,0 +1,130 @@
+"""
+热门文章排行
+
+热度公式：score = (views * 0.3 + likes * 0.4 + comment_count * 0.3) / (days + 1) ^ 0.5
+
+括号内的基础分作为 Post.hot_score 持久化（带索引），在浏览量、点赞数、
+已审核评论数变化时增量刷新；时间衰减在读取时计算。由于衰减因子不大于 1，
+按基础分从高到低分批读取，当已选出的第 N 名得分不低于剩余文章的最高基础分时即可停止。
+"""
+import heapq
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, Q, Count, OuterRef, Subquery, Value, FloatField, ExpressionWrapper
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from common.cache import bump_model_generation
+
+HOT_WEIGHTS = {
+    'views': 0.3,
+    'likes': 0.4,
+    'comment_count': 0.3,
+}
+
+
+def compute_hot_score(views, likes, comment_count):
+    """计算基础热度分（不含时间衰减）"""
+    return (
+        views * HOT_WEIGHTS['views'] +
+        likes * HOT_WEIGHTS['likes'] +
+        comment_count * HOT_WEIGHTS['comment_count']
+    )
+
+
+def hot_score_expression():
+    """基础热度分的数据库表达式"""
+    return ExpressionWrapper(
+        F('views') * HOT_WEIGHTS['views'] +
+        F('likes') * HOT_WEIGHTS['likes'] +
+        F('comment_count') * HOT_WEIGHTS['comment_count'],
+        output_field=FloatField()
+    )
+
+
+def time_decay(post, now=None):
+    """时间衰减因子：1 / (发布天数 + 1) ^ 0.5"""
+    now = now or timezone.now()
+    days = max(0, (now - (post.published_at or post.created_at)).total_seconds() / 86400)
+    return 1 / ((days + 1) ** 0.5)
+
+
+def refresh_hot_scores(post_ids):
+    """根据当前计数重新计算基础热度分"""
+    from .models import Post
+
+    if post_ids:
+        Post.objects.filter(pk__in=list(post_ids)).update(hot_score=hot_score_expression())
+
+
+def refresh_comment_counts(post_ids):
+    """重新统计已审核评论数并刷新基础热度分"""
+    from comments.models import Comment
+    from .models import Post
+
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    approved_comments = Comment.objects.filter(
+        content_type=ContentType.objects.get_for_model(Post),
+        object_id=OuterRef('pk'),
+        is_approved=True
+    ).order_by().values('object_id').annotate(count=Count('id')).values('count')
+    Post.objects.filter(pk__in=post_ids).update(comment_count=Coalesce(Subquery(approved_comments), Value(0)))
+    refresh_hot_scores(post_ids)
+    # 评论数会展示给用户，批量更新不触发信号，手动更新版本号
+    bump_model_generation(Post)
+
+
+def refresh_comment_counts_for(comments):
+    """刷新一组评论所关联文章的评论数"""
+    from .models import Post
+
+    post_type = ContentType.objects.get_for_model(Post)
+    refresh_comment_counts({
+        comment.object_id for comment in comments if comment.content_type_id == post_type.id
+    })
+
+
+def get_hot_posts(limit=10, batch_size=50, queryset=None):
+    """
+    获取热门文章
+
+    Args:
+        queryset: 加载文章使用的查询集（如按序列化器投影后的查询集）
+
+    Returns:
+        list: 按衰减后热度从高到低排列的文章
+    """
+    from .models import Post
+
+    candidates = Post.objects.filter(
+        status='published',
+        is_encrypted=False  # 排除加密文章
+    ).only('id', 'hot_score', 'published_at', 'created_at').order_by('-hot_score', '-id')
+
+    now = timezone.now()
+    best = []  # 小顶堆：(衰减后得分, -id)
+    last = None
+    while True:
+        batch = candidates
+        if last is not None:
+            batch = batch.filter(Q(hot_score__lt=last.hot_score) | Q(hot_score=last.hot_score, id__lt=last.id))
+        batch = list(batch[:batch_size])
+        for post in batch:
+            item = (post.hot_score * time_decay(post, now), -post.id)
+            if len(best) < limit:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+        if len(batch) < batch_size:
+            break
+        last = batch[-1]
+        # 剩余文章的衰减后得分不会超过其基础分
+        if len(best) >= limit and best[0][0] >= last.hot_score:
+            break
+
+    ranked_ids = [-post_id for _, post_id in sorted(best, reverse=True)]
+    if queryset is None:
+        queryset = Post.objects.select_related('author', 'category').prefetch_related('tags')
+    posts = queryset.filter(id__in=ranked_ids)
+    posts_by_id = {post.id: post for post in posts}
+    return [posts_by_id[post_id] for post_id in ranked_ids if post_id in posts_by_id]
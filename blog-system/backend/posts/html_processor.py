@@ -0,0 +1,169 @@
+"""
+渲染后 HTML 的单遍处理
+
+基于 html.parser 逐个处理标签和文本，一遍完成：
+- 按白名单清理标签、属性和链接协议（防止 XSS）；
+- 为标题分配 ID 并收集目录项；
+- 统计字数（中日韩字符按字计数，其他文字按单词计数，不含代码块）。
+
+取代原先的正则改写标题加 bleach 重新解析整篇文档。
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+from markdown.extensions.toc import slugify
+from common.security import DEFAULT_ALLOWED_TAGS, ALLOWED_PROTOCOLS
+from .tokenizer import CJK_RANGES
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+VOID_TAGS = {'br', 'img', 'hr'}
+# 内容不作为文本保留的标签
+DROP_CONTENT_TAGS = {'script', 'style'}
+URL_ATTRIBUTES = {'href', 'src', 'cite'}
+
+CJK_PATTERN = re.compile(rf'[{CJK_RANGES}]')
+WORD_PATTERN = re.compile(rf'[^\W_{CJK_RANGES}]+')
+# 浏览器解析协议时会忽略的空白和控制字符
+URL_IGNORED_PATTERN = re.compile(r'[\x00-\x20\x7f]+')
+URL_SCHEME_PATTERN = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+
+
+def count_words(text):
+    """统计字数：中日韩字符每字计 1，其他文字按单词计数"""
+    return len(CJK_PATTERN.findall(text)) + len(WORD_PATTERN.findall(text))
+
+
+def is_safe_url(url, protocols=ALLOWED_PROTOCOLS):
+    """相对地址或白名单协议的地址"""
+    match = URL_SCHEME_PATTERN.match(URL_IGNORED_PATTERN.sub('', url))
+    return match is None or match.group(1).lower() in protocols
+
+
+class HTMLProcessor(HTMLParser):
+    """
+    单遍 HTML 处理器
+
+    Args:
+        allowed_tags: 允许的标签
+        allowed_attributes: 允许的属性，'*' 对所有标签生效
+    """
+
+    def __init__(self, allowed_tags=None, allowed_attributes=None):
+        super().__init__(convert_charrefs=True)
+        self.allowed_tags = set(allowed_tags or DEFAULT_ALLOWED_TAGS)
+        self.allowed_attributes = allowed_attributes or {}
+        self.output = []
+        self.open_tags = []
+        self.drop_depth = 0
+        self.pre_depth = 0
+        self.heading = None  # 正在处理的标题：{'tag', 'attrs', 'output', 'text'}
+        self.headings = []  # [(级别, ID, 文本)]
+        self.word_count = 0
+
+    def _out(self):
+        return self.heading['output'] if self.heading else self.output
+
+    def _clean_attrs(self, tag, attrs):
+        allowed = set(self.allowed_attributes.get('*', [])) | set(self.allowed_attributes.get(tag, []))
+        cleaned = []
+        for name, value in attrs:
+            if name not in allowed:
+                continue
+            value = value or ''
+            if name in URL_ATTRIBUTES and not is_safe_url(value):
+                continue
+            cleaned.append((name, value))
+        return cleaned
+
+    @staticmethod
+    def _format_attrs(attrs):
+        return ''.join(f' {name}="{escape(value)}"' for name, value in attrs)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth += 1
+            return
+        if self.drop_depth or tag not in self.allowed_tags:
+            return
+        attrs = self._clean_attrs(tag, attrs)
+        if tag == 'pre':
+            self.pre_depth += 1
+        if tag in HEADING_TAGS and self.heading is None:
+            # 标题内容先缓存，结束时才能确定 ID
+            self.heading = {'tag': tag, 'attrs': attrs, 'output': [], 'text': []}
+            self.open_tags.append(tag)
+            return
+        self._out().append(f'<{tag}{self._format_attrs(attrs)}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth = max(0, self.drop_depth - 1)
+            return
+        if self.drop_depth or tag not in self.open_tags:
+            return
+        # 关闭未闭合的内层标签
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self._close(open_tag)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag):
+        if tag == 'pre':
+            self.pre_depth -= 1
+        if self.heading is not None and tag == self.heading['tag']:
+            self._finish_heading()
+        else:
+            self._out().append(f'</{tag}>')
+
+    def _finish_heading(self):
+        heading, self.heading = self.heading, None
+        text = ''.join(heading['text']).strip()
+        attrs = [(name, value) for name, value in heading['attrs'] if name != 'id']
+        heading_id = dict(heading['attrs']).get('id') or slugify(text, '-')
+        attrs.append(('id', heading_id))
+        self.headings.append((int(heading['tag'][1]), heading_id, text))
+        tag = heading['tag']
+        self.output.append(f'<{tag}{self._format_attrs(attrs)}>{"".join(heading["output"])}</{tag}>')
+
+    def handle_data(self, data):
+        if self.drop_depth:
+            return
+        self._out().append(escape(data, quote=False))
+        if self.heading is not None:
+            self.heading['text'].append(data)
+        if not self.pre_depth:
+            self.word_count += count_words(data)
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self._close(self.open_tags.pop())
+
+
+def process_html(html, allowed_tags=None, allowed_attributes=None):
+    """
+    清理 HTML 并提取标题和字数
+
+    Returns:
+        dict: {
+            'html': 清理后的 HTML（标题均带 ID）,
+            'headings': [(级别, ID, 文本)]，ID 只在本段 HTML 内由 Markdown 保证唯一,
+            'word_count': 字数,
+        }
+    """
+    processor = HTMLProcessor(allowed_tags, allowed_attributes)
+    processor.feed(html)
+    processor.close()
+    return {
+        'html': ''.join(processor.output),
+        'headings': processor.headings,
+        'word_count': processor.word_count,
+    }
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from posts.feed_files import build_feed_files
+
+
+class Command(BaseCommand):
+    help = '生成 RSS、Atom 和 JSON Feed 文件（部署后执行一次，之后随数据变更自动更新）'
+
+    def handle(self, *args, **options):
+        count = build_feed_files()
+        self.stdout.write(self.style.SUCCESS(f'已生成 {count} 个 Feed 文件'))
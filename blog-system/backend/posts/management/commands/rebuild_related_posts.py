@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from posts.related import rebuild_related_posts
+
+
+class Command(BaseCommand):
+    help = '重建文章词向量和相关文章索引'
+
+    def handle(self, *args, **options):
+        count = rebuild_related_posts()
+        self.stdout.write(self.style.SUCCESS(f'已为 {count} 篇文章计算相关文章'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from posts.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = '重建文章全文搜索索引'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        count = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{backend.__class__.__name__}：已索引 {count} 篇文章'))
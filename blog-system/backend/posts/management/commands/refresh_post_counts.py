@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from posts.taxonomy import refresh_all_post_counts
+
+
+class Command(BaseCommand):
+    help = '重新统计分类和标签的已发布文章数'
+
+    def handle(self, *args, **options):
+        refresh_all_post_counts()
+        self.stdout.write(self.style.SUCCESS('分类和标签的文章数已更新'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from posts.models import Post
+from posts.rendering import compute_content_hash, estimate_read_time, render_cached
+from common.cache import bump_model_generation
+
+
+class Command(BaseCommand):
+    help = '重新渲染内容或渲染配置已变化的文章'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='忽略内容哈希，重新渲染所有文章')
+
+    def handle(self, *args, **options):
+        count = 0
+        for post in Post.objects.only('id', 'content', 'content_hash').iterator():
+            if not post.content:
+                continue
+            if not options['force'] and compute_content_hash(post.content) == post.content_hash:
+                continue
+            content_hash, rendered = render_cached(post.content)
+            Post.objects.filter(pk=post.pk).update(
+                content_html=rendered['html'],
+                toc=rendered['toc'],
+                word_count=rendered['word_count'],
+                read_time=estimate_read_time(rendered['word_count']),
+                content_hash=content_hash
+            )
+            count += 1
+        if count:
+            bump_model_generation(Post)
+        self.stdout.write(self.style.SUCCESS(f'已重新渲染 {count} 篇文章'))
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# 迁移中的表结构固定写出，不引用 posts.search（重放迁移时不受之后代码修改的影响）
+FTS_TABLE = 'posts_post_fts'
+
+
+def create_search_index(apps, schema_editor):
+    """在 SQLite 上创建 FTS5 索引表并导入现有文章"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+            "USING fts5(title, excerpt, content, tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, title, excerpt, content) '
+            "SELECT id, title, excerpt, CASE WHEN is_encrypted THEN '' ELSE content END FROM posts_post"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_password_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
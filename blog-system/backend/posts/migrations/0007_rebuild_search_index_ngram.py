@@ -0,0 +1,35 @@
+import sqlite3
+from django.db import migrations
+
+# 迁移中的表结构固定写出，不引用 posts.search（重放迁移时不受之后代码修改的影响）
+FTS_TABLE = 'posts_post_fts'
+
+
+def recreate_search_index(apps, schema_editor):
+    """
+    按 n-gram 分词的表结构重建 FTS5 索引表
+
+    索引内容需要由当前的分词器生成，迁移只建空表，
+    升级后运行 python manage.py rebuild_search_index 导入文章。
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    # SQLite 3.43+ 使用无内容表（contentless），只保存倒排列表而不保存词元原文
+    options = "tokenize='unicode61 remove_diacritics 2'"
+    if sqlite3.sqlite_version_info >= (3, 43, 0):
+        options += ", content='', contentless_delete=1"
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        cursor.execute(f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, excerpt, content, {options})')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate_search_index, migrations.RunPython.noop),
+    ]
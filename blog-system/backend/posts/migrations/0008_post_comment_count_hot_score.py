@@ -0,0 +1,63 @@
+from django.db import migrations, models
+
+# 迁移时的热度权重（固定写出，不引用 posts.hot，重放迁移时不受之后代码修改的影响）
+HOT_WEIGHTS = {
+    'views': 0.3,
+    'likes': 0.4,
+    'comment_count': 0.3,
+}
+
+
+def compute_hot_score(views, likes, comment_count):
+    return (
+        views * HOT_WEIGHTS['views'] +
+        likes * HOT_WEIGHTS['likes'] +
+        comment_count * HOT_WEIGHTS['comment_count']
+    )
+
+
+def backfill_hot_scores(apps, schema_editor):
+    """统计现有文章的已审核评论数并计算热度基础分"""
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('comments', 'Comment')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    post_type = ContentType.objects.filter(app_label='posts', model='post').first()
+    comment_counts = {}
+    if post_type:
+        for object_id in Comment.objects.filter(content_type=post_type, is_approved=True).values_list('object_id', flat=True):
+            comment_counts[object_id] = comment_counts.get(object_id, 0) + 1
+
+    for post in Post.objects.only('id', 'views', 'likes').iterator():
+        comment_count = comment_counts.get(post.id, 0)
+        Post.objects.filter(pk=post.pk).update(
+            comment_count=comment_count,
+            hot_score=compute_hot_score(post.views, post.likes, comment_count),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_rebuild_search_index_ngram'),
+        ('comments', '0002_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, help_text='已审核的评论数，由系统自动维护', verbose_name='评论数'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0, help_text='不含时间衰减的热度基础分，由系统自动维护', verbose_name='热度'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-hot_score'], name='posts_post_hot_sco_0fd92b_idx'),
+        ),
+        migrations.RunPython(backfill_hot_scores, migrations.RunPython.noop),
+    ]
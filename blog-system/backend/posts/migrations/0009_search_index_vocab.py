@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# 迁移中的表名固定写出，不引用 posts.search（重放迁移时不受之后代码修改的影响）
+FTS_TABLE = 'posts_post_fts'
+VOCAB_TABLE = 'posts_post_fts_vocab'
+
+
+def create_vocab_table(apps, schema_editor):
+    """为 FTS5 索引创建词表视图（提供文档频率）"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {VOCAB_TABLE} '
+            f"USING fts5vocab({FTS_TABLE}, 'row')"
+        )
+
+
+def drop_vocab_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {VOCAB_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_comment_count_hot_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_vocab_table, drop_vocab_table),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_search_index_vocab'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTermVector',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='term_vector', serialize=False, to='posts.post')),
+                ('terms', models.JSONField(default=dict, help_text='已归一化的 TF-IDF 权重', verbose_name='词元权重')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '文章词向量',
+                'verbose_name_plural': '文章词向量',
+            },
+        ),
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='相关度')),
+            ],
+            options={
+                'verbose_name': '相关文章',
+                'verbose_name_plural': '相关文章',
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.AddField(
+            model_name='relatedpost',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='posts.post'),
+        ),
+        migrations.AddField(
+            model_name='relatedpost',
+            name='related',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_from', to='posts.post'),
+        ),
+        migrations.AddIndex(
+            model_name='relatedpost',
+            index=models.Index(fields=['post', '-score'], name='posts_relat_post_id_78409f_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='relatedpost',
+            unique_together={('post', 'related')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_posttermvector_relatedpost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, help_text='content_html 对应的源文本和渲染配置的哈希', max_length=64, verbose_name='内容哈希'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:00
+
+from django.db import migrations, models
+
+
+def mark_posts_for_render(apps, schema_editor):
+    """
+    清空现有文章的内容哈希，由 render_posts 命令重新渲染并生成目录
+
+    迁移中不调用 posts.rendering：重放迁移时会执行之后修改过的渲染代码。
+    """
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(content_hash='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='渲染时根据标题生成', verbose_name='目录'),
+        ),
+        migrations.RunPython(mark_posts_for_render, migrations.RunPython.noop),
+    ]
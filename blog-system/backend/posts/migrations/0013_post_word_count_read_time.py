@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:09
+
+from django.db import migrations, models
+
+
+def mark_posts_for_render(apps, schema_editor):
+    """
+    清空现有文章的内容哈希，由 render_posts 命令重新渲染并统计字数和阅读时间
+
+    迁移中不调用 posts.rendering：重放迁移时会执行之后修改过的渲染代码。
+    """
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(content_hash='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_toc'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='read_time',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='分钟', verbose_name='阅读时间'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='渲染时统计，不含代码块', verbose_name='字数'),
+        ),
+        migrations.RunPython(mark_posts_for_render, migrations.RunPython.noop),
+    ]
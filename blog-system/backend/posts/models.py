@@ -1,11 +1,13 @@
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
-import markdown
-import bleach
-from .utils import hash_content_password, extract_toc_from_markdown, add_ids_to_html_headings
-from common.security import sanitize_html
+from .utils import hash_content_password
+from .rendering import (
+    BlockRender, render_blocks, compute_content_hash, get_cached_render, cache_render, should_defer, render_in_background,
+    estimate_read_time
+)
+from .hot import compute_hot_score
 
 User = get_user_model()
 
@@ -22,6 +24,16 @@ class Post(models.Model):
     excerpt = models.TextField(max_length=500, blank=True, verbose_name='摘要')
     content = models.TextField(verbose_name='内容')
     content_html = models.TextField(editable=False, verbose_name='HTML 内容')
+    toc = models.JSONField(default=list, blank=True, editable=False, verbose_name='目录', help_text='渲染时根据标题生成')
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name='内容哈希',
+        help_text='content_html 对应的源文本和渲染配置的哈希'
+    )
+    word_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='字数', help_text='渲染时统计，不含代码块')
+    read_time = models.PositiveIntegerField(default=1, editable=False, verbose_name='阅读时间', help_text='分钟')
     cover = models.ImageField(upload_to='posts/', null=True, blank=True, verbose_name='封面图')
     
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts', verbose_name='作者')
@@ -45,6 +57,8 @@ class Post(models.Model):
     
     views = models.PositiveIntegerField(default=0, verbose_name='浏览量')
     likes = models.PositiveIntegerField(default=0, verbose_name='点赞数')
+    comment_count = models.PositiveIntegerField(default=0, verbose_name='评论数', help_text='已审核的评论数，由系统自动维护')
+    hot_score = models.FloatField(default=0, verbose_name='热度', help_text='不含时间衰减的热度基础分，由系统自动维护')
     
     published_at = models.DateTimeField(null=True, blank=True, verbose_name='发布时间')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
@@ -64,6 +78,7 @@ class Post(models.Model):
             models.Index(fields=['category']),
             models.Index(fields=['views']),
             models.Index(fields=['likes']),
+            models.Index(fields=['-hot_score']),
             models.Index(fields=['is_top']),
             models.Index(fields=['-published_at', 'status']),
             models.Index(fields=['-published_at', 'category']),
@@ -81,14 +96,22 @@ class Post(models.Model):
         self._handle_password()
         
         # 处理内容转换
+        self._background_render = None
         self._process_content()
         
+        # 更新热度基础分
+        self.hot_score = compute_hot_score(self.views, self.likes, self.comment_count)
+        
         # 设置发布时间
         if self.status == 'published' and not self.published_at:
             from django.utils import timezone
             self.published_at = timezone.now()
             
         super().save(*args, **kwargs)
+
+        if self._background_render is not None:
+            post_id, content, block_render = self.pk, self.content, self._background_render
+            transaction.on_commit(lambda: render_in_background(post_id, content, block_render))
     
     def _handle_password(self):
         """处理文章密码加密和更新时间"""
@@ -127,53 +150,48 @@ class Post(models.Model):
             self.password_updated_at = timezone.now()
     
     def _process_content(self):
-        """处理Markdown内容转换为HTML"""
+        """处理Markdown内容转换为HTML（内容和渲染配置未变化时跳过）"""
         if not self.content:
             self.content_html = ''
+            self.toc = []
+            self.content_hash = ''
+            self.word_count = 0
+            self.read_time = estimate_read_time(0)
             return
-            
-        html = markdown.markdown(
-            self.content,
-            extensions=['codehilite', 'fenced_code', 'tables', 'toc']
-        )
-        # 为标题添加 ID 属性（用于 TOC 锚点）
-        html = add_ids_to_html_headings(html)
-        # 使用安全工具清理 HTML，防止 XSS
-        # 允许标题标签保留 id 属性
-        allowed_attributes = {
-            '*': ['class'],
-            'a': ['href', 'title', 'target'],
-            'img': ['src', 'alt', 'title', 'width', 'height'],
-            'blockquote': ['cite'],
-            'code': ['class'],
-            'pre': ['class'],
-            'h1': ['id', 'class'],
-            'h2': ['id', 'class'],
-            'h3': ['id', 'class'],
-            'h4': ['id', 'class'],
-            'h5': ['id', 'class'],
-            'h6': ['id', 'class'],
-        }
-        self.content_html = sanitize_html(html, allowed_attributes=allowed_attributes)
+
+        content_hash = compute_content_hash(self.content)
+        if content_hash == self.content_hash and self.content_html:
+            return
+        rendered = get_cached_render(content_hash)
+        if rendered is None:
+            # 按块增量渲染，只有内容变化的块需要重新渲染
+            block_render = BlockRender(self.content)
+            if should_defer(block_render):
+                # 交给后台进程池渲染，content_html 暂时保留上一版本
+                self._background_render = block_render
+                return
+            rendered = block_render.complete(render_blocks(block_render.missing))
+            cache_render(content_hash, rendered)
+        self.content_html = rendered['html']
+        self.toc = rendered['toc']
+        self.word_count = rendered['word_count']
+        self.read_time = estimate_read_time(rendered['word_count'])
+        self.content_hash = content_hash
 
     def get_absolute_url(self):
         return reverse('post-detail', kwargs={'slug': self.slug})
 
     def get_word_count(self):
         """获取文章字数"""
-        return len(self.content)
+        return self.word_count
 
     def get_read_time(self):
         """估算阅读时间（分钟）"""
-        word_count = self.get_word_count()
-        # 假设每分钟阅读 200 字
-        return max(1, round(word_count / 200))
+        return self.read_time
     
     def get_toc(self):
-        """获取文章目录（TOC）"""
-        if not self.content:
-            return []
-        return extract_toc_from_markdown(self.content)
+        """获取文章目录（TOC，渲染时生成）"""
+        return self.toc
 
 
 class PostLike(models.Model):
@@ -199,3 +217,30 @@ class PostView(models.Model):
         verbose_name = '浏览记录'
         verbose_name_plural = '浏览记录'
         ordering = ['-viewed_at']
+
+
+class PostTermVector(models.Model):
+    """文章词向量（TF-IDF 权重最高的词元，用于计算相关文章）"""
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='term_vector')
+    terms = models.JSONField(default=dict, verbose_name='词元权重', help_text='已归一化的 TF-IDF 权重')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        verbose_name = '文章词向量'
+        verbose_name_plural = '文章词向量'
+
+
+class RelatedPost(models.Model):
+    """相关文章（预计算）"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_from')
+    score = models.FloatField(verbose_name='相关度')
+
+    class Meta:
+        unique_together = ['post', 'related']
+        verbose_name = '相关文章'
+        verbose_name_plural = '相关文章'
+        ordering = ['-score']
+        indexes = [
+            models.Index(fields=['post', '-score']),
+        ]
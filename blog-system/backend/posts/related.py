@@ -0,0 +1,210 @@
+"""
+相关文章索引
+
+相关度由三部分组成：正文 TF-IDF 词向量的余弦相似度、标签重合度（Jaccard）、是否同一分类。
+每篇已发布文章保存权重最高的 VECTOR_SIZE 个词元（PostTermVector），
+以及相关度最高的 RELATED_LIMIT 篇文章（RelatedPost）。
+文章保存后在后台增量更新：重新计算该文章的相关列表，并修正其他文章列表中与它相关的条目。
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from django.conf import settings
+from django.db import connection, transaction
+from .search import get_search_backend
+from .tokenizer import tokenize, DEFAULT_NGRAM_SIZE
+
+logger = logging.getLogger(__name__)
+
+RELATED_LIMIT = 5
+VECTOR_SIZE = 100
+TITLE_WEIGHT = 3  # 标题中的词元按出现 3 次计算
+SCORE_WEIGHTS = {
+    'content': 0.6,
+    'tags': 0.3,
+    'category': 0.1,
+}
+# 影响相关度的字段，仅这些字段变化时才需要更新
+RELEVANT_FIELDS = {'title', 'content', 'category', 'status', 'is_encrypted'}
+UPDATE_DELAY = 2  # 等待标签保存完成后再更新（秒）
+
+CODE_PATTERN = re.compile(r'```.*?```|~~~.*?~~~|`[^`\n]*`', re.DOTALL)
+LINK_PATTERN = re.compile(r'https?://\S+|\]\([^)]*\)')
+
+
+def extract_term_counts(post):
+    """统计文章词元出现次数（忽略代码和链接，加密文章只使用标题）"""
+    ngram_size = getattr(settings, 'POST_SEARCH_NGRAM_SIZE', DEFAULT_NGRAM_SIZE)
+    counts = Counter()
+    for token in tokenize(post.title, ngram_size):
+        counts[token] += TITLE_WEIGHT
+    if not post.is_encrypted and post.content:
+        text = LINK_PATTERN.sub(' ', CODE_PATTERN.sub(' ', post.content))
+        counts.update(tokenize(text, ngram_size))
+    # 单字符和纯数字词元区分度太低
+    return Counter({term: count for term, count in counts.items() if len(term) > 1 and not term.isdigit()})
+
+
+def build_term_vector(counts):
+    """根据词频和文档频率计算归一化的 TF-IDF 向量（只保留权重最高的词元）"""
+    if not counts:
+        return {}
+    total, frequencies = get_search_backend().document_frequencies(counts.keys())
+    weights = {}
+    for term, count in counts.items():
+        idf = math.log((total + 1) / (frequencies.get(term, 0) + 1)) + 1 if total else 1
+        weights[term] = (1 + math.log(count)) * idf
+    top_terms = heapq.nlargest(VECTOR_SIZE, weights.items(), key=lambda item: item[1])
+    norm = math.sqrt(sum(weight * weight for _, weight in top_terms))
+    return {term: round(weight / norm, 6) for term, weight in top_terms}
+
+
+def cosine_similarity(vector_a, vector_b):
+    if len(vector_a) > len(vector_b):
+        vector_a, vector_b = vector_b, vector_a
+    return sum(weight * vector_b.get(term, 0) for term, weight in vector_a.items())
+
+
+def compute_score(profile_a, profile_b):
+    """
+    计算两篇文章的相关度
+
+    Args:
+        profile_a, profile_b: (词向量, 标签 ID 集合, 分类 ID)
+    """
+    vector_a, tags_a, category_a = profile_a
+    vector_b, tags_b, category_b = profile_b
+    tag_score = len(tags_a & tags_b) / len(tags_a | tags_b) if tags_a and tags_b else 0
+    category_score = 1 if category_a and category_a == category_b else 0
+    return (
+        SCORE_WEIGHTS['content'] * cosine_similarity(vector_a, vector_b) +
+        SCORE_WEIGHTS['tags'] * tag_score +
+        SCORE_WEIGHTS['category'] * category_score
+    )
+
+
+def load_profiles():
+    """加载所有已发布文章的 (词向量, 标签 ID 集合, 分类 ID)"""
+    from .models import Post, PostTermVector
+
+    published = Post.objects.filter(status='published')
+    vectors = dict(PostTermVector.objects.filter(post__in=published).values_list('post_id', 'terms'))
+    tags = {}
+    for post_id, tag_id in Post.tags.through.objects.filter(post__in=published).values_list('post_id', 'tag_id'):
+        tags.setdefault(post_id, set()).add(tag_id)
+    return {
+        post_id: (vectors.get(post_id, {}), tags.get(post_id, set()), category_id)
+        for post_id, category_id in published.values_list('id', 'category_id')
+    }
+
+
+def _top_related(scores):
+    return heapq.nlargest(RELATED_LIMIT, ((score, post_id) for post_id, score in scores.items() if score > 0))
+
+
+def update_related_posts(post_id):
+    """增量更新一篇文章的相关文章，并修正其他文章中与它相关的条目"""
+    from .models import Post, PostTermVector, RelatedPost
+
+    post = Post.objects.filter(pk=post_id).only('id', 'title', 'content', 'status', 'is_encrypted').first()
+    if post is None or post.status != 'published':
+        # 未发布的文章不参与相关推荐
+        RelatedPost.objects.filter(post_id=post_id).delete()
+        RelatedPost.objects.filter(related_id=post_id).delete()
+        PostTermVector.objects.filter(post_id=post_id).delete()
+        return
+
+    vector = build_term_vector(extract_term_counts(post))
+    PostTermVector.objects.update_or_create(post_id=post_id, defaults={'terms': vector})
+
+    profiles = load_profiles()
+    own_profile = profiles.pop(post_id, (vector, set(), None))
+    scores = {other_id: compute_score(own_profile, profile) for other_id, profile in profiles.items()}
+
+    existing = {}
+    for owner_id, related_id, score in RelatedPost.objects.filter(
+        post_id__in=profiles.keys()
+    ).values_list('post_id', 'related_id', 'score'):
+        existing.setdefault(owner_id, {})[related_id] = score
+
+    # 其他文章的相关列表：去掉本文旧的得分，加入新得分后重新取前 N 名
+    changed_owners = []
+    new_entries = [
+        RelatedPost(post_id=post_id, related_id=related_id, score=score)
+        for score, related_id in _top_related(scores)
+    ]
+    for owner_id, score in scores.items():
+        entries = existing.get(owner_id, {})
+        candidates = {related_id: value for related_id, value in entries.items() if related_id != post_id}
+        candidates[post_id] = score
+        top = _top_related(candidates)
+        if {related_id: value for value, related_id in top} != entries:
+            changed_owners.append(owner_id)
+            new_entries.extend(
+                RelatedPost(post_id=owner_id, related_id=related_id, score=value) for value, related_id in top
+            )
+
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=[post_id, *changed_owners]).delete()
+        RelatedPost.objects.bulk_create(new_entries, batch_size=500)
+
+
+def rebuild_related_posts():
+    """重建所有文章的词向量和相关文章，返回处理的文章数"""
+    from .models import Post, PostTermVector, RelatedPost
+
+    published = Post.objects.filter(status='published').only('id', 'title', 'content', 'is_encrypted')
+    vectors = [
+        PostTermVector(post_id=post.id, terms=build_term_vector(extract_term_counts(post)))
+        for post in published.iterator()
+    ]
+    with transaction.atomic():
+        PostTermVector.objects.all().delete()
+        PostTermVector.objects.bulk_create(vectors, batch_size=500)
+
+    profiles = load_profiles()
+    entries = []
+    for post_id, profile in profiles.items():
+        scores = {
+            other_id: compute_score(profile, other_profile)
+            for other_id, other_profile in profiles.items() if other_id != post_id
+        }
+        entries.extend(
+            RelatedPost(post_id=post_id, related_id=related_id, score=score)
+            for score, related_id in _top_related(scores)
+        )
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(entries, batch_size=500)
+    return len(profiles)
+
+
+_pending_updates = {}
+_pending_lock = threading.Lock()
+
+
+def schedule_related_update(post_id):
+    """延迟在后台更新相关文章（短时间内多次保存只更新一次）"""
+    with _pending_lock:
+        timer = _pending_updates.pop(post_id, None)
+        if timer is not None:
+            timer.cancel()
+        timer = threading.Timer(UPDATE_DELAY, _run_update, args=(post_id,))
+        timer.daemon = True
+        _pending_updates[post_id] = timer
+        timer.start()
+
+
+def _run_update(post_id):
+    with _pending_lock:
+        _pending_updates.pop(post_id, None)
+    try:
+        update_related_posts(post_id)
+    except Exception as e:
+        logger.error(f'更新相关文章失败（文章 {post_id}）：{e}', exc_info=True)
+    finally:
+        # 后台线程使用独立的数据库连接，用完关闭
+        connection.close()
@@ -0,0 +1,374 @@
+"""
+文章 Markdown 渲染
+
+渲染结果以“源文本 + 渲染配置”的哈希为键：
+- Post.content_hash 记录 content_html 对应的哈希，内容未变化时保存文章不再渲染；
+- 渲染结果同时写入共享缓存，内容改回旧版本或多篇文章内容相同时直接复用。
+目录（TOC）在拼接文档、确定标题 ID 的同一遍处理中生成，与 content_html 中的 ID 一致，
+随渲染结果保存在 Post.toc 中。
+渲染后的 HTML 由 html_processor 单遍处理：清理、标题 ID 和字数一次完成。
+
+文档按顶层 Markdown 块（段落、标题、列表、代码块、表格等）切分，
+每个块的 HTML 按块哈希单独缓存，自动保存时通常只有被修改的块需要重新渲染，
+拼接后在整篇文档范围内重新保证标题 ID 唯一，结果与整篇渲染一致。
+包含引用式链接定义、[TOC] 标记或 HTML 块的文档无法安全切分，作为一个整块渲染。
+
+较长的文章在自动保存时（defer_large_renders 上下文内）交给进程池渲染，
+请求立即返回，渲染完成后仅当文章内容仍未变化时写回 content_html。
+"""
+import contextvars
+import hashlib
+import html as html_lib
+import logging
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import markdown
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from common.cache import bump_model_generation
+from .html_processor import process_html
+from .utils import build_toc_hierarchy
+
+logger = logging.getLogger(__name__)
+
+# 修改渲染逻辑后递增，使已缓存的结果失效
+RENDERER_VERSION = 4
+MARKDOWN_EXTENSIONS = ['codehilite', 'fenced_code', 'tables', 'toc']
+# 允许标题标签保留 id 属性（用于 TOC 锚点）
+ALLOWED_ATTRIBUTES = {
+    '*': ['class'],
+    'a': ['href', 'title', 'target'],
+    'img': ['src', 'alt', 'title', 'width', 'height'],
+    'blockquote': ['cite'],
+    'code': ['class'],
+    'pre': ['class'],
+    'h1': ['id', 'class'],
+    'h2': ['id', 'class'],
+    'h3': ['id', 'class'],
+    'h4': ['id', 'class'],
+    'h5': ['id', 'class'],
+    'h6': ['id', 'class'],
+}
+CACHE_KEY_PREFIX = 'post_html:'
+BLOCK_CACHE_KEY_PREFIX = 'post_html_block:'
+
+FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+LIST_ITEM_PATTERN = re.compile(r'^ {0,3}([*+-]|\d+[.)])\s')
+BLOCKQUOTE_PATTERN = re.compile(r'^ {0,3}>')
+# 引用式链接定义、[TOC] 标记和 HTML 块会跨块生效
+UNSPLITTABLE_PATTERN = re.compile(r'^ {0,3}\[[^\]]+\]:|^ {0,3}\[TOC\]\s*$|^ {0,3}<[a-zA-Z!/?]', re.MULTILINE)
+
+_renderer_config = ':'.join([
+    str(RENDERER_VERSION),
+    ','.join(MARKDOWN_EXTENSIONS),
+    markdown.__version__,
+])
+
+
+def _hash(text):
+    digest = hashlib.sha256(_renderer_config.encode())
+    digest.update(b'\0')
+    digest.update(text.encode())
+    return digest.hexdigest()
+
+
+def compute_content_hash(content):
+    """计算源文本和渲染配置的哈希"""
+    return _hash(content)
+
+
+def split_blocks(content):
+    """
+    将 Markdown 切分为可以独立渲染的顶层块
+
+    块之间以空行分隔；围栏代码块内的空行、缩进的续行、松散列表的后续列表项
+    以及紧跟在引用之后的引用（空行分隔的两段引用会合并为一个 blockquote）归入同一个块。无法安全切分时返回只包含整篇文档的列表。
+    """
+    if UNSPLITTABLE_PATTERN.search(content):
+        return [content]
+
+    blocks = []
+    current = []
+    blank_lines = []
+    fence = None
+    in_list = False
+    in_quote = False
+    for line in content.split('\n'):
+        if fence:
+            current.append(line)
+            stripped = line.strip()
+            if stripped.startswith(fence) and stripped == stripped[0] * len(stripped):
+                fence = None
+            continue
+        if not line.strip():
+            if current:
+                blank_lines.append(line)
+            continue
+
+        is_list_item = bool(LIST_ITEM_PATTERN.match(line))
+        is_quote = bool(BLOCKQUOTE_PATTERN.match(line))
+        if blank_lines:
+            # 缩进的续行、松散列表的后续列表项和引用的后续段落属于同一个块
+            if line[0] in ' \t' or (is_list_item and in_list) or (is_quote and in_quote):
+                current.extend(blank_lines)
+            else:
+                blocks.append('\n'.join(current))
+                current = []
+                in_list = False
+                in_quote = False
+            blank_lines = []
+        current.append(line)
+        in_list = in_list or is_list_item
+        in_quote = in_quote or is_quote
+        match = FENCE_PATTERN.match(line)
+        if match:
+            fence = match.group(1)
+    if current:
+        blocks.append('\n'.join(current))
+    return blocks
+
+
+_local = threading.local()
+
+
+def _get_markdown():
+    """每个线程复用一个 Markdown 实例（创建实例需要加载全部扩展）"""
+    md = getattr(_local, 'markdown', None)
+    if md is None:
+        md = _local.markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return md.reset()
+
+
+def render_block(block):
+    """
+    将一个 Markdown 块渲染为安全的 HTML
+
+    清理、标题 ID 和字数在同一遍 HTML 解析中完成，返回 process_html 的结果。
+    """
+    return process_html(_get_markdown().convert(block), allowed_attributes=ALLOWED_ATTRIBUTES)
+
+
+def render_blocks(blocks):
+    """
+    渲染一组 Markdown 块
+
+    在进程池中执行，不能依赖 Django 配置和数据库。
+    """
+    return [render_block(block) for block in blocks]
+
+
+HEADING_ID_COUNTER_PATTERN = re.compile(r'^(.*)_([0-9]+)$')
+
+
+def _unique_id(heading_id, used_ids):
+    """与 markdown toc 扩展相同的去重规则：重复的 ID 追加或递增 _N 后缀"""
+    while heading_id in used_ids or not heading_id:
+        match = HEADING_ID_COUNTER_PATTERN.match(heading_id)
+        if match:
+            heading_id = f'{match.group(1)}_{int(match.group(2)) + 1}'
+        else:
+            heading_id = f'{heading_id}_1'
+    used_ids.add(heading_id)
+    return heading_id
+
+
+def join_blocks(block_results):
+    """
+    拼接各块的渲染结果，在整篇文档范围内保证标题 ID 唯一，并生成目录和字数
+
+    Returns:
+        dict: {'html': HTML, 'toc': 层级化的目录, 'word_count': 字数}
+    """
+    used_ids = set()
+    toc = []
+    html_parts = []
+    word_count = 0
+    for result in block_results:
+        html = result['html']
+        offset = 0
+        for level, heading_id, heading_text in result['headings']:
+            unique_id = _unique_id(heading_id, used_ids)
+            if unique_id != heading_id:
+                # 与前面的块重复时改写本块中对应标题的 ID（标题按出现顺序查找）
+                old = f' id="{html_lib.escape(heading_id)}"'
+                new = f' id="{html_lib.escape(unique_id)}"'
+                position = html.find(old, offset)
+                if position != -1:
+                    html = f'{html[:position]}{new}{html[position + len(old):]}'
+                    offset = position + len(new)
+            if heading_text:
+                toc.append({'level': level, 'text': heading_text, 'id': unique_id, 'children': []})
+        if html:
+            html_parts.append(html)
+        word_count += result['word_count']
+    return {
+        'html': '\n'.join(html_parts),
+        'toc': build_toc_hierarchy(toc),
+        'word_count': word_count,
+    }
+
+
+def estimate_read_time(word_count):
+    """估算阅读时间（分钟）"""
+    words_per_minute = getattr(settings, 'POST_READ_WORDS_PER_MINUTE', 200)
+    return max(1, round(word_count / words_per_minute))
+
+
+def render_markdown(content):
+    """将 Markdown 渲染为安全的 HTML、目录和字数（不使用缓存）"""
+    if not content:
+        return {'html': '', 'toc': [], 'word_count': 0}
+    return join_blocks(render_blocks(split_blocks(content)))
+
+
+class BlockRender:
+    """
+    一次增量渲染
+
+    构造时切分文档并从缓存读取已渲染的块，missing 为需要重新渲染的块。
+    """
+
+    def __init__(self, content):
+        self.blocks = split_blocks(content)
+        self.keys = [f'{BLOCK_CACHE_KEY_PREFIX}{_hash(block)}' for block in self.blocks]
+        self.rendered = cache.get_many(set(self.keys))
+        missing = {}
+        for key, block in zip(self.keys, self.blocks):
+            if key not in self.rendered:
+                missing.setdefault(key, block)
+        self.missing_keys = list(missing)
+        self.missing = list(missing.values())
+
+    @property
+    def missing_size(self):
+        return sum(len(block) for block in self.missing)
+
+    def complete(self, rendered_blocks):
+        """写入新渲染的块并拼接整篇文档，返回 join_blocks 的结果"""
+        new_blocks = dict(zip(self.missing_keys, rendered_blocks))
+        if new_blocks:
+            cache.set_many(new_blocks, timeout=getattr(settings, 'POST_RENDER_CACHE_TIMEOUT', 86400))
+            self.rendered.update(new_blocks)
+        return join_blocks(self.rendered[key] for key in self.keys)
+
+
+def get_cached_render(content_hash):
+    return cache.get(f'{CACHE_KEY_PREFIX}{content_hash}')
+
+
+def cache_render(content_hash, rendered):
+    cache.set(f'{CACHE_KEY_PREFIX}{content_hash}', rendered, timeout=getattr(settings, 'POST_RENDER_CACHE_TIMEOUT', 86400))
+
+
+def render_cached(content):
+    """
+    渲染 Markdown（优先使用整篇缓存，其次按块增量渲染）
+
+    Returns:
+        tuple: (内容哈希, join_blocks 的结果)
+    """
+    content_hash = compute_content_hash(content)
+    rendered = get_cached_render(content_hash)
+    if rendered is None:
+        block_render = BlockRender(content)
+        rendered = block_render.complete(render_blocks(block_render.missing))
+        cache_render(content_hash, rendered)
+    return content_hash, rendered
+
+
+_defer_large_renders = contextvars.ContextVar('defer_large_renders', default=False)
+
+
+@contextmanager
+def defer_large_renders():
+    """在此上下文内保存的较长文章改为后台渲染（用于自动保存）"""
+    token = _defer_large_renders.set(True)
+    try:
+        yield
+    finally:
+        _defer_large_renders.reset(token)
+
+
+def should_defer(block_render):
+    """是否应将渲染交给后台进程池（只计算需要重新渲染的部分）"""
+    threshold = getattr(settings, 'POST_RENDER_ASYNC_THRESHOLD', 20000)
+    return _defer_large_renders.get() and block_render.missing_size >= threshold
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_in_flight = {}  # content_hash -> (Future, BlockRender)，相同内容只渲染一次
+
+
+def get_executor():
+    """获取渲染进程池（首次使用时创建）"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # 使用 spawn 启动子进程，避免 fork 多线程进程时复制锁和数据库连接
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'POST_RENDER_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def render_in_background(post_id, content, block_render):
+    """在进程池中渲染缺失的块，完成后写回 content_html"""
+    content_hash = compute_content_hash(content)
+    with _executor_lock:
+        in_flight = _in_flight.get(content_hash)
+    if in_flight is None:
+        try:
+            future = get_executor().submit(render_blocks, block_render.missing)
+        except Exception as e:
+            logger.warning(f'提交渲染任务失败，改为同步渲染：{e}')
+            _store_render(post_id, content, content_hash, block_render.complete(render_blocks(block_render.missing)))
+            return
+        with _executor_lock:
+            _in_flight[content_hash] = (future, block_render)
+    else:
+        # 相同内容正在渲染，复用同一个任务
+        future, block_render = in_flight
+    caller = threading.get_ident()
+    future.add_done_callback(lambda done: _on_render_done(post_id, content, content_hash, block_render, done, caller))
+
+
+def _on_render_done(post_id, content, content_hash, block_render, future, caller):
+    with _executor_lock:
+        _in_flight.pop(content_hash, None)
+    try:
+        try:
+            rendered_blocks = future.result()
+        except Exception as e:
+            logger.warning(f'后台渲染失败，改为同步渲染（文章 {post_id}）：{e}')
+            rendered_blocks = render_blocks(block_render.missing)
+        _store_render(post_id, content, content_hash, block_render.complete(rendered_blocks))
+    except Exception as e:
+        logger.error(f'写回渲染结果失败（文章 {post_id}）：{e}', exc_info=True)
+    finally:
+        # 回调通常在进程池的管理线程中执行，用完关闭数据库连接；
+        # 任务已完成时回调在调用线程中立即执行，不能关闭请求的连接
+        if threading.get_ident() != caller:
+            connection.close()
+
+
+def _store_render(post_id, content, content_hash, rendered):
+    from .models import Post
+
+    cache_render(content_hash, rendered)
+    # 文章在渲染期间又被修改时，以最新一次保存的渲染结果为准
+    updated = Post.objects.filter(pk=post_id, content=content).update(
+        content_html=rendered['html'],
+        toc=rendered['toc'],
+        word_count=rendered['word_count'],
+        read_time=estimate_read_time(rendered['word_count']),
+        content_hash=content_hash
+    )
+    if updated:
+        # 批量更新不触发信号，手动更新版本号使缓存的文章响应失效
+        bump_model_generation(Post)
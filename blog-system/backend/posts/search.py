@@ -0,0 +1,324 @@
+"""
+文章全文检索
+
+搜索后端是可插拔的：通过 settings.POST_SEARCH_BACKEND 指定类路径，
+未配置时 SQLite 数据库使用 FTS5 倒排索引，其他数据库退化为 icontains 扫描。
+索引由 posts.signals 在文章保存/删除时同步。
+
+FTS5 索引中保存的是经 posts.tokenizer 切分后的词元（中文按 n-gram 切分），
+高亮片段则基于原文在 Python 中生成。
+"""
+import bisect
+import html
+import logging
+import sqlite3
+from django.conf import settings
+from django.db import connection, OperationalError, DatabaseError
+from django.db.models import Q, Case, When, IntegerField
+from django.utils.module_loading import import_string
+from .tokenizer import tokenize, tokenize_query, highlight_terms, normalize_with_offsets, DEFAULT_NGRAM_SIZE
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ('title', 'excerpt', 'content')
+
+
+def get_indexable_fields(post):
+    """获取需要索引的字段（加密文章不索引正文，避免通过搜索泄露内容）"""
+    return {
+        'title': post.title or '',
+        'excerpt': post.excerpt or '',
+        'content': '' if post.is_encrypted else (post.content or ''),
+    }
+
+
+def build_highlight(text, terms, context_chars=60):
+    """
+    在原文中定位查询词并生成高亮片段
+
+    Args:
+        text: 原文
+        terms: 已归一化的查询词列表
+        context_chars: 命中位置前后保留的字符数
+
+    Returns:
+        str: 转义后的 HTML 片段，未命中时返回空字符串
+    """
+    if not text or not terms:
+        return ''
+    # 查询词经过 NFKC 归一化，原文同样归一化后查找，命中位置再映射回原文
+    normalized, starts, ends = normalize_with_offsets(text)
+    first_hit = min(
+        (position for position in (normalized.find(term) for term in terms) if position >= 0),
+        default=-1
+    )
+    if first_hit < 0:
+        return ''
+
+    start = max(0, starts[first_hit] - context_chars)
+    end = min(len(text), starts[first_hit] + context_chars * 2)
+    # 原文窗口对应的归一化文本范围
+    window_start = bisect.bisect_left(starts, start)
+    window_end = bisect.bisect_right(ends, end)
+    window = normalized[window_start:window_end]
+
+    # 收集窗口内所有命中区间（原文位置，长词优先，跳过重叠部分）
+    spans = []
+    for term in terms:
+        position = window.find(term)
+        while position >= 0:
+            span = (starts[window_start + position], ends[window_start + position + len(term) - 1])
+            if not any(s < span[1] and span[0] < e for s, e in spans):
+                spans.append(span)
+            position = window.find(term, position + len(term))
+    spans.sort()
+
+    parts = ['…' if start > 0 else '']
+    cursor = start
+    for span_start, span_end in spans:
+        parts.append(html.escape(text[cursor:span_start]))
+        parts.append(f'<mark>{html.escape(text[span_start:span_end])}</mark>')
+        cursor = span_end
+    parts.append(html.escape(text[cursor:end]))
+    parts.append('…' if end < len(text) else '')
+    return ''.join(parts)
+
+
+class BaseSearchBackend:
+    """搜索后端接口"""
+
+    def index_post(self, post):
+        """写入或更新一篇文章的索引"""
+        raise NotImplementedError
+
+    def remove_post(self, post_id):
+        """从索引中移除文章"""
+        raise NotImplementedError
+
+    def rebuild(self, posts=None):
+        """
+        重建全部索引
+
+        Args:
+            posts: 待索引的文章（需包含 id、title、excerpt、content、is_encrypted），默认全部文章
+
+        Returns:
+            int: 索引的文章数
+        """
+        raise NotImplementedError
+
+    def search(self, query, limit=None, fields=None, prefix=False):
+        """
+        搜索文章
+
+        Args:
+            query: 用户输入的查询
+            limit: 最多返回的结果数
+            fields: 限定搜索的字段，默认全部字段
+            prefix: 是否将最后一个词按前缀匹配（用于输入联想）
+
+        Returns:
+            list: 按相关度从高到低排列的 (post_id, score) 列表
+        """
+        raise NotImplementedError
+
+    def document_frequencies(self, terms):
+        """
+        获取词元的文档频率（用于计算 IDF）
+
+        Returns:
+            tuple: (文档总数, {词元: 包含该词元的文档数})，不支持时返回 (0, {})
+        """
+        return 0, {}
+
+    def highlight(self, query, post_ids):
+        """
+        为指定文章生成高亮片段（摘要优先，其次正文）
+
+        Returns:
+            dict: post_id -> 高亮后的 HTML 片段
+        """
+        from .models import Post
+
+        terms = highlight_terms(query)
+        highlights = {}
+        rows = Post.objects.filter(id__in=post_ids).values_list('id', 'excerpt', 'content', 'is_encrypted')
+        for post_id, excerpt, content, is_encrypted in rows:
+            for text in (excerpt, '' if is_encrypted else content):
+                snippet = build_highlight(text, terms)
+                if snippet:
+                    highlights[post_id] = snippet
+                    break
+        return highlights
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """基于 icontains 的兜底搜索（无需维护索引）"""
+
+    def index_post(self, post):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def rebuild(self, posts=None):
+        return 0
+
+    def search(self, query, limit=None, fields=None, prefix=False):
+        from .models import Post
+
+        fields = fields or SEARCH_FIELDS
+        search_query = Q()
+        for field in fields:
+            condition = Q(**{f'{field}__icontains': query})
+            if field == 'content':
+                condition &= Q(is_encrypted=False)
+            search_query |= condition
+
+        queryset = Post.objects.filter(search_query).annotate(
+            relevance=Case(
+                *[When(**{f'{field}__icontains': query}, then=len(fields) - index) for index, field in enumerate(fields)],
+                default=0,
+                output_field=IntegerField()
+            )
+        ).order_by('-relevance', '-published_at', '-created_at').values_list('id', 'relevance')
+        if limit:
+            queryset = queryset[:limit]
+        return list(queryset)
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """SQLite FTS5 倒排索引，按 BM25 排序"""
+    table = 'posts_post_fts'
+    vocab_table = 'posts_post_fts_vocab'
+    # BM25 列权重：标题 > 摘要 > 正文
+    column_weights = (10.0, 5.0, 1.0)
+
+    def __init__(self):
+        self.fallback = DatabaseSearchBackend()
+        self.ngram_size = getattr(settings, 'POST_SEARCH_NGRAM_SIZE', DEFAULT_NGRAM_SIZE)
+
+    @classmethod
+    def create_table(cls, cursor):
+        """
+        创建索引表
+
+        SQLite 3.43+ 使用无内容表（contentless），只保存倒排列表而不保存词元原文。
+        """
+        options = "tokenize='unicode61 remove_diacritics 2'"
+        if sqlite3.sqlite_version_info >= (3, 43, 0):
+            options += ", content='', contentless_delete=1"
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {cls.table} '
+            f'USING fts5({", ".join(SEARCH_FIELDS)}, {options})'
+        )
+        # 词表视图，提供每个词元的文档频率
+        cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.vocab_table} USING fts5vocab({cls.table}, 'row')")
+
+    @classmethod
+    def drop_table(cls, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {cls.vocab_table}')
+        cursor.execute(f'DROP TABLE IF EXISTS {cls.table}')
+
+    def build_document(self, post):
+        """将文章字段切分为以空格分隔的词元"""
+        fields = get_indexable_fields(post)
+        return [' '.join(tokenize(fields[field], self.ngram_size)) for field in SEARCH_FIELDS]
+
+    def build_match_query(self, query, fields=None, prefix=False):
+        """将用户输入转换为 FTS5 查询（短语之间为 AND）"""
+        phrases = tokenize_query(query, self.ngram_size, prefix_last=prefix)
+        expression = ' AND '.join(
+            f'"{" ".join(tokens)}"' + (' *' if is_prefix else '')
+            for tokens, is_prefix in phrases
+        )
+        if expression and fields:
+            expression = f'{{{" ".join(fields)}}} : ({expression})'
+        return expression
+
+    def index_post(self, post):
+        document = self.build_document(post)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table}(rowid, {", ".join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s)',
+                [post.pk, *document]
+            )
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [post_id])
+
+    def rebuild(self, posts=None):
+        from .models import Post
+
+        if posts is None:
+            posts = Post.objects.only('id', *SEARCH_FIELDS, 'is_encrypted').iterator()
+        count = 0
+        with connection.cursor() as cursor:
+            self.drop_table(cursor)
+            self.create_table(cursor)
+        for post in posts:
+            self.index_post(post)
+            count += 1
+        return count
+
+    def search(self, query, limit=None, fields=None, prefix=False):
+        match_query = self.build_match_query(query, fields=fields, prefix=prefix)
+        if not match_query:
+            return []
+        weights = ', '.join(str(weight) for weight in self.column_weights)
+        sql = (
+            f'SELECT rowid, bm25({self.table}, {weights}) AS rank FROM {self.table} '
+            f'WHERE {self.table} MATCH %s ORDER BY rank'
+        )
+        params = [match_query]
+        if limit:
+            sql += ' LIMIT %s'
+            params.append(limit)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                # bm25() 越小越相关，取反作为得分
+                return [(row[0], -row[1]) for row in cursor.fetchall()]
+        except (OperationalError, DatabaseError) as e:
+            logger.warning(f'FTS5 搜索失败，退化为普通查询：{e}')
+            return self.fallback.search(query, limit=limit, fields=fields, prefix=prefix)
+
+    def document_frequencies(self, terms, chunk_size=500):
+        terms = list(terms)
+        frequencies = {}
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT COUNT(*) FROM {self.table}')
+                total = cursor.fetchone()[0]
+                for start in range(0, len(terms), chunk_size):
+                    chunk = terms[start:start + chunk_size]
+                    placeholders = ', '.join(['%s'] * len(chunk))
+                    cursor.execute(
+                        f'SELECT term, doc FROM {self.vocab_table} WHERE term IN ({placeholders})',
+                        chunk
+                    )
+                    frequencies.update(cursor.fetchall())
+        except (OperationalError, DatabaseError) as e:
+            logger.warning(f'读取 FTS5 词表失败：{e}')
+            return 0, {}
+        return total, frequencies
+
+
+_backend = None
+
+
+def get_search_backend():
+    """获取当前配置的搜索后端（进程内单例）"""
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'POST_SEARCH_BACKEND', '')
+        if backend_path:
+            backend_class = import_string(backend_path)
+        elif connection.vendor == 'sqlite':
+            backend_class = SQLiteFTSBackend
+        else:
+            backend_class = DatabaseSearchBackend
+        _backend = backend_class()
+    return _backend
@@ -4,6 +4,7 @@ from .utils import check_password_verified_in_session
 from categories.serializers import CategorySerializer
 from tags.serializers import TagSerializer
 from users.serializers import UserPublicSerializer
+from common.likes import LikedListSerializer, LikedSerializerMixin
 
 
 class PostListSerializer(serializers.ModelSerializer):
@@ -11,30 +12,27 @@ class PostListSerializer(serializers.ModelSerializer):
     author = UserPublicSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    word_count = serializers.SerializerMethodField()
-    read_time = serializers.SerializerMethodField()
+    highlight = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
         fields = [
             'id', 'title', 'slug', 'excerpt', 'cover', 'author', 'category', 'tags',
-            'status', 'is_top', 'views', 'likes', 'word_count', 'read_time', 'published_at', 'created_at'
+            'status', 'is_top', 'views', 'likes', 'word_count', 'read_time', 'highlight',
+            'published_at', 'created_at'
         ]
 
-    def get_word_count(self, obj):
-        return obj.get_word_count()
+    def get_highlight(self, obj):
+        """搜索结果的高亮片段（仅搜索时返回）"""
+        return self.context.get('search_highlights', {}).get(obj.id)
 
-    def get_read_time(self, obj):
-        return obj.get_read_time()
 
-
-class PostDetailSerializer(serializers.ModelSerializer):
+class PostDetailSerializer(LikedSerializerMixin, serializers.ModelSerializer):
     """文章详情序列化器"""
+    like_model = PostLike
     author = UserPublicSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    word_count = serializers.SerializerMethodField()
-    read_time = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     is_encrypted = serializers.BooleanField(read_only=True)
     is_password_verified = serializers.SerializerMethodField()
@@ -50,20 +48,9 @@ class PostDetailSerializer(serializers.ModelSerializer):
             'is_encrypted', 'is_password_verified', 'preview_content_html', 'toc',
             'published_at', 'created_at', 'updated_at'
         ]
+        list_serializer_class = LikedListSerializer
         read_only_fields = ['id', 'views', 'likes', 'created_at', 'updated_at']
 
-    def get_word_count(self, obj):
-        return obj.get_word_count()
-
-    def get_read_time(self, obj):
-        return obj.get_read_time()
-
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return PostLike.objects.filter(post=obj, user=request.user).exists()
-        return False
-    
     def get_is_password_verified(self, obj):
         """检查密码是否已验证"""
         request = self.context.get('request')
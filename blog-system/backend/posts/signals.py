@@ -0,0 +1,173 @@
+"""
+文章相关信号处理
+"""
+import logging
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from comments.models import Comment
+from categories.models import Category
+from tags.models import Tag
+from settings.models import SiteSettings
+from .models import Post
+from .search import get_search_backend
+from .suggestions import invalidate_suggestions
+from .hot import refresh_comment_counts_for
+from .related import schedule_related_update, RELEVANT_FIELDS
+from .archives import invalidate_archives, ARCHIVE_FIELDS
+from .taxonomy import refresh_category_post_counts, refresh_tag_post_counts
+from .feed_files import invalidate_feed_files
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    """文章保存后同步搜索索引"""
+    try:
+        get_search_backend().index_post(instance)
+    except Exception as e:
+        # 索引失败不影响文章保存
+        logger.error(f'更新搜索索引失败（文章 {instance.pk}）：{e}', exc_info=True)
+
+
+@receiver(post_delete, sender=Post)
+def remove_search_index(sender, instance, **kwargs):
+    """文章删除后移除搜索索引"""
+    try:
+        get_search_backend().remove_post(instance.pk)
+    except Exception as e:
+        logger.error(f'移除搜索索引失败（文章 {instance.pk}）：{e}', exc_info=True)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_post_suggestions(sender, **kwargs):
+    """文章或标签变更后使搜索建议索引失效"""
+    invalidate_suggestions()
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_suggestions_on_tags_changed(sender, action, **kwargs):
+    """文章标签变更后使搜索建议索引失效"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_suggestions()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_post_comment_count(sender, instance, **kwargs):
+    """评论变更后刷新文章的评论数和热度"""
+    refresh_comment_counts_for([instance])
+
+
+@receiver(post_save, sender=Post)
+def update_related_posts_on_save(sender, instance, update_fields=None, **kwargs):
+    """文章内容、分类或状态变化后更新相关文章"""
+    if update_fields and not RELEVANT_FIELDS.intersection(update_fields):
+        return
+    schedule_related_update(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_related_posts_on_tags_changed(sender, instance, action, reverse, **kwargs):
+    """文章标签变化后更新相关文章"""
+    if action in ('post_add', 'post_remove', 'post_clear') and not reverse:
+        schedule_related_update(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_archives(sender, update_fields=None, **kwargs):
+    """文章发布、撤回或标题等变化后使归档缓存失效"""
+    if update_fields and not ARCHIVE_FIELDS.intersection(update_fields):
+        return
+    invalidate_archives()
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_taxonomy(sender, instance, update_fields=None, **kwargs):
+    """记录保存前的分类和状态，用于判断是否需要刷新文章数"""
+    instance._previous_taxonomy = None
+    if instance.pk and not (update_fields and not {'category', 'status'}.intersection(update_fields)):
+        instance._previous_taxonomy = Post.objects.filter(pk=instance.pk).values_list('category_id', 'status').first()
+
+
+@receiver(post_save, sender=Post)
+def update_taxonomy_post_counts(sender, instance, created, update_fields=None, **kwargs):
+    """文章发布、撤回或修改分类后刷新分类和标签的文章数"""
+    previous = getattr(instance, '_previous_taxonomy', None)
+    if not created and previous is None:
+        return
+    previous_category, previous_status = previous or (None, None)
+    if previous_category != instance.category_id or previous_status != instance.status:
+        refresh_category_post_counts([previous_category, instance.category_id])
+    if not created and previous_status != instance.status:
+        refresh_tag_post_counts(instance.tags.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post_tags(sender, instance, **kwargs):
+    """记录被删除文章的标签（删除后关联已不存在）"""
+    instance._deleted_tag_ids = list(instance.tags.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def update_taxonomy_post_counts_on_delete(sender, instance, **kwargs):
+    """文章删除后刷新分类和标签的文章数"""
+    if instance.status == 'published':
+        refresh_category_post_counts([instance.category_id])
+        refresh_tag_post_counts(getattr(instance, '_deleted_tag_ids', []))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tag_post_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    """文章标签变化后刷新标签的文章数"""
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_tag_ids = list(instance.tags.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if reverse:
+            refresh_tag_post_counts([instance.pk])
+        elif action == 'post_clear':
+            refresh_tag_post_counts(getattr(instance, '_cleared_tag_ids', []))
+        elif instance.status == 'published':
+            refresh_tag_post_counts(pk_set or [])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_feeds_on_post_changed(sender, instance, **kwargs):
+    """已发布的文章变更或撤回后重新生成 Feed 文件（草稿保存不影响 Feed）"""
+    previous = getattr(instance, '_previous_taxonomy', None)
+    if instance.status == 'published' or (previous and previous[1] == 'published'):
+        invalidate_feed_files('posts', 'comments')
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_feeds_on_tags_changed(sender, instance, action, reverse, **kwargs):
+    """已发布文章的标签变化后重新生成 Feed 文件"""
+    if action in ('post_add', 'post_remove', 'post_clear') and (reverse or instance.status == 'published'):
+        invalidate_feed_files('posts')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_feeds_on_taxonomy_changed(sender, **kwargs):
+    """分类或标签变更后重新生成文章 Feed 文件"""
+    invalidate_feed_files('posts')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_feeds_on_comment_changed(sender, **kwargs):
+    """评论变更后重新生成评论 Feed 文件"""
+    invalidate_feed_files('comments')
+
+
+@receiver(post_save, sender=SiteSettings)
+def invalidate_feeds_on_settings_changed(sender, **kwargs):
+    """站点名称等变化后重新生成所有 Feed 文件"""
+    invalidate_feed_files('posts', 'comments')
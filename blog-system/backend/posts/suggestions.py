@@ -0,0 +1,113 @@
+"""
+搜索建议（输入联想）索引
+
+在进程内存中维护已发布、未加密文章的标题和标签的有序索引：
+前缀查询通过二分查找完成，中间匹配通过字符二元组倒排表完成。
+索引按 POST_SUGGESTION_REBUILD_INTERVAL 定期重建，
+文章或标签变更时由信号更新版本号，各进程在下一次查询时重建。
+"""
+import bisect
+import threading
+import time
+from django.conf import settings
+from django.db.models import Sum, Q
+from common.cache import get_generation, bump_generation
+from .tokenizer import normalize
+
+GENERATION_NAMESPACE = 'post_suggestions'
+
+
+def invalidate_suggestions():
+    """标记搜索建议索引需要重建"""
+    bump_generation(GENERATION_NAMESPACE)
+
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class SuggestionIndex:
+    """标题和标签的联想索引"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (keys, entries, grams)：keys 为排序后的 (归一化文本, 条目序号)，
+        # entries 为 (文本, 热度, 归一化文本)
+        self._snapshot = ([], [], {})
+        self._generation = None
+        self._built_at = 0
+
+    def _is_stale(self):
+        interval = getattr(settings, 'POST_SUGGESTION_REBUILD_INTERVAL', 300)
+        if time.monotonic() - self._built_at > interval:
+            return True
+        return get_generation(GENERATION_NAMESPACE) != self._generation
+
+    def _load_entries(self):
+        """加载 (文本, 热度) 列表"""
+        from .models import Post
+        from tags.models import Tag
+
+        visible = Q(posts__status='published', posts__is_encrypted=False)
+        popularity = {}
+        for title, views, likes in Post.objects.filter(
+            status='published', is_encrypted=False
+        ).values_list('title', 'views', 'likes'):
+            popularity[title] = max(popularity.get(title, 0), views + likes)
+        for name, views, likes in Tag.objects.filter(visible).annotate(
+            total_views=Sum('posts__views', filter=visible),
+            total_likes=Sum('posts__likes', filter=visible),
+        ).values_list('name', 'total_views', 'total_likes'):
+            popularity.setdefault(name, (views or 0) + (likes or 0))
+        return list(popularity.items())
+
+    def rebuild(self, force=True):
+        """从数据库重建索引（force 为 False 时，若其他线程已完成重建则跳过）"""
+        with self._lock:
+            if not force and not self._is_stale():
+                return
+            generation = get_generation(GENERATION_NAMESPACE)
+            entries = [(text, popularity, normalize(text)) for text, popularity in self._load_entries()]
+            keys = sorted((key, index) for index, (_, _, key) in enumerate(entries))
+            grams = {}
+            for key, index in keys:
+                for gram in _bigrams(key) or {key}:
+                    grams.setdefault(gram, set()).add(index)
+            self._snapshot = (keys, entries, grams)
+            self._generation = generation
+            self._built_at = time.monotonic()
+
+    def suggest(self, keyword, limit=5):
+        """
+        获取联想结果
+
+        前缀匹配优先于中间匹配，同类结果按热度排序。
+        """
+        if self._is_stale():
+            self.rebuild(force=False)
+        keys, entries, grams = self._snapshot
+        query = normalize(keyword).strip()
+        if not query:
+            return []
+
+        prefix_matches = set()
+        position = bisect.bisect_left(keys, (query, -1))
+        while position < len(keys) and keys[position][0].startswith(query):
+            prefix_matches.add(keys[position][1])
+            position += 1
+
+        infix_matches = set()
+        query_grams = _bigrams(query)
+        if query_grams:
+            candidates = set.intersection(*(grams.get(gram, set()) for gram in query_grams))
+            infix_matches = {
+                index for index in candidates
+                if index not in prefix_matches and query in entries[index][2]
+            }
+
+        ranked = sorted(prefix_matches, key=lambda index: -entries[index][1])
+        ranked += sorted(infix_matches, key=lambda index: -entries[index][1])
+        return [entries[index][0] for index in ranked[:limit]]
+
+
+suggestion_index = SuggestionIndex()
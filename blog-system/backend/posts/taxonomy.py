@@ -0,0 +1,51 @@
+"""
+分类和标签的文章数
+
+Category.post_count 和 Tag.post_count 保存已发布的文章数，
+由 posts.signals 在文章发布/撤回、修改分类、增删标签时增量刷新，
+序列化时无需再逐条统计。批量更新不触发信号，刷新后手动更新分类和标签的版本号。
+"""
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from common.cache import bump_model_generation
+
+
+def refresh_category_post_counts(category_ids):
+    """重新统计指定分类的已发布文章数"""
+    from categories.models import Category
+    from .models import Post
+
+    category_ids = [category_id for category_id in set(category_ids) if category_id]
+    if not category_ids:
+        return
+    published = Post.objects.filter(
+        category=OuterRef('pk'),
+        status='published'
+    ).order_by().values('category').annotate(count=Count('id')).values('count')
+    Category.objects.filter(pk__in=category_ids).update(post_count=Coalesce(Subquery(published), Value(0)))
+    bump_model_generation(Category)
+
+
+def refresh_tag_post_counts(tag_ids):
+    """重新统计指定标签的已发布文章数"""
+    from tags.models import Tag
+    from .models import Post
+
+    tag_ids = [tag_id for tag_id in set(tag_ids) if tag_id]
+    if not tag_ids:
+        return
+    published = Post.tags.through.objects.filter(
+        tag=OuterRef('pk'),
+        post__status='published'
+    ).order_by().values('tag').annotate(count=Count('id')).values('count')
+    Tag.objects.filter(pk__in=tag_ids).update(post_count=Coalesce(Subquery(published), Value(0)))
+    bump_model_generation(Tag)
+
+
+def refresh_all_post_counts():
+    """重新统计所有分类和标签的文章数"""
+    from categories.models import Category
+    from tags.models import Tag
+
+    refresh_category_post_counts(Category.objects.values_list('id', flat=True))
+    refresh_tag_post_counts(Tag.objects.values_list('id', flat=True))
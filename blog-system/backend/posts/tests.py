@@ -1,3 +1,54 @@
-from django.test import TestCase
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from .models import Post
+from .search import SQLiteFTSBackend, build_highlight
+from .tokenizer import highlight_terms, tokenize_query
 
-# Create your tests here.
+
+class TokenizeQueryTests(SimpleTestCase):
+    """搜索查询切分"""
+
+    def test_quoted_cjk_phrase_has_no_tail_gram(self):
+        self.assertEqual(tokenize_query('"中文"'), [(['中文'], False)])
+        self.assertEqual(tokenize_query('"中文搜索"'), [(['中文', '文搜', '搜索'], False)])
+
+    def test_quoted_phrase_keeps_tail_before_following_word(self):
+        self.assertEqual(tokenize_query('"很好 hello"'), [(['很好', '好', 'hello'], False)])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 索引仅用于 SQLite')
+class QuotedPhraseSearchTests(TestCase):
+    """双引号短语在较长的中文片段中间也能命中"""
+
+    def setUp(self):
+        author = get_user_model().objects.create_user('author', 'author@example.com', 'password')
+        self.post = Post.objects.create(
+            title='测试', slug='test', content='我们的中文搜索引擎很好', author=author, status='published'
+        )
+        self.backend = SQLiteFTSBackend()
+        self.backend.rebuild()
+
+    def search_ids(self, query):
+        return [post_id for post_id, rank in self.backend.search(query)]
+
+    def test_quoted_phrase_inside_longer_run(self):
+        self.assertEqual(self.search_ids('"中文"'), [self.post.pk])
+        self.assertEqual(self.search_ids('"中文搜索"'), [self.post.pk])
+
+    def test_quoted_phrase_does_not_match_across_gap(self):
+        self.assertEqual(self.search_ids('"中搜"'), [])
+
+
+class BuildHighlightTests(SimpleTestCase):
+    """高亮片段按归一化后的文本匹配，标记原文"""
+
+    def test_full_width_text_matches_normalized_query(self):
+        self.assertEqual(build_highlight('使用Ｄｊａｎｇｏ开发', highlight_terms('django')), '使用<mark>Ｄｊａｎｇｏ</mark>开发')
+
+    def test_length_changing_normalization(self):
+        self.assertEqual(
+            build_highlight('\ufb01le 和 cafe\u0301', highlight_terms('file café')),
+            '<mark>\ufb01le</mark> 和 <mark>cafe\u0301</mark>'
+        )
@@ -0,0 +1,164 @@
+"""
+搜索分词工具
+
+中文等 CJK 文本没有空格分词，这里按连续字符切分为 n-gram（默认二元组），
+拉丁文字按单词切分并转为小写。索引与查询使用同一套规则，保证短语匹配一致。
+"""
+import re
+import unicodedata
+
+# CJK 统一表意文字、扩展 A、兼容表意文字、日文假名、韩文音节
+CJK_RANGES = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'
+TOKEN_PATTERN = re.compile(rf'(?P<cjk>[{CJK_RANGES}]+)|(?P<word>[^\W_{CJK_RANGES}]+)')
+# 查询语法：双引号包裹短语，词尾 * 表示前缀匹配
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+DEFAULT_NGRAM_SIZE = 2
+
+
+def normalize(text):
+    """统一全角/半角并转为小写"""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def normalize_with_offsets(text):
+    """
+    归一化文本并记录每个字符在原文中的位置
+
+    NFKC 和小写转换可能改变长度（如 "ﬁ" 变为 "fi"），这里按字符（连同其后的组合字符）逐段归一化。
+
+    Returns:
+        tuple: (归一化后的文本, 各字符对应原文的起始位置列表, 结束位置列表)
+    """
+    parts = []
+    starts = []
+    ends = []
+    index = 0
+    length = len(text or '')
+    while index < length:
+        end = index + 1
+        while end < length and unicodedata.combining(text[end]):
+            end += 1
+        normalized = normalize(text[index:end])
+        parts.append(normalized)
+        starts.extend([index] * len(normalized))
+        ends.extend([end] * len(normalized))
+        index = end
+    return ''.join(parts), starts, ends
+
+
+def _shingle(run, size, with_tail=True):
+    """
+    将连续的 CJK 字符切分为 n-gram
+
+    with_tail 为 True 时在末尾补充逐渐缩短的片段（如 "ab" 之后补 "b"），
+    使每个字符位置都有以它开头的词元，单字或短词可以通过前缀查询命中。
+    """
+    if len(run) <= size:
+        grams = [run]
+        start = 1
+    else:
+        grams = [run[i:i + size] for i in range(len(run) - size + 1)]
+        start = len(run) - size + 1
+    if with_tail:
+        grams.extend(run[i:] for i in range(start, len(run)))
+    return grams
+
+
+def tokenize(text, ngram_size=DEFAULT_NGRAM_SIZE):
+    """
+    将文本切分为索引词元
+
+    Args:
+        text: 原始文本
+        ngram_size: CJK n-gram 长度（2 为二元组，3 为三元组）
+
+    Returns:
+        list: 按出现顺序排列的词元
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(normalize(text)):
+        if match.group('cjk'):
+            tokens.extend(_shingle(match.group('cjk'), ngram_size))
+        else:
+            tokens.append(match.group('word'))
+    return tokens
+
+
+def _quoted_phrase(text, ngram_size):
+    """
+    将双引号包裹的内容切分为一个短语
+
+    索引中只有位于 CJK 片段末尾的字符才有补充的尾部词元，短语中间的 CJK 片段后面紧跟其他文字，
+    在原文中必然处于片段末尾，需要补充尾部；最后一个 CJK 片段在原文中可能还有后续字符，
+    不补充尾部（否则 "中文" 切分为 "中文 文"，无法命中 "中文搜索"），短于 n-gram 长度时按前缀匹配。
+
+    Returns:
+        tuple: (tokens, is_prefix)，没有可检索的文字时返回 None
+    """
+    runs = list(TOKEN_PATTERN.finditer(normalize(text)))
+    tokens = []
+    is_prefix = False
+    for index, run in enumerate(runs):
+        if not run.group('cjk'):
+            tokens.append(run.group('word'))
+            continue
+        cjk = run.group('cjk')
+        is_last = index == len(runs) - 1
+        tokens.extend(_shingle(cjk, ngram_size, with_tail=not is_last))
+        is_prefix = is_last and len(cjk) < ngram_size
+    return (tokens, is_prefix) if tokens else None
+
+
+def tokenize_query(query, ngram_size=DEFAULT_NGRAM_SIZE, prefix_last=False):
+    """
+    解析搜索查询
+
+    普通查询词中的每一段连续文字（CJK 或单词）构成一个短语；
+    双引号包裹的内容整体切分为一个短语（见 _quoted_phrase）；
+    以 * 结尾或短于 n-gram 长度的 CJK 片段按前缀匹配。
+
+    Args:
+        query: 用户输入的查询
+        ngram_size: CJK n-gram 长度
+        prefix_last: 是否将最后一个词作为前缀匹配（用于输入联想）
+
+    Returns:
+        list: 短语列表，每个短语为 (tokens, is_prefix)，短语之间为 AND 关系
+    """
+    phrases = []
+    for match in QUERY_PATTERN.finditer(query or ''):
+        if match.group(1) is not None:
+            phrase = _quoted_phrase(match.group(1), ngram_size)
+            if phrase:
+                phrases.append(phrase)
+            continue
+
+        term = match.group(2)
+        explicit_prefix = term.endswith('*')
+        runs = list(TOKEN_PATTERN.finditer(normalize(term.rstrip('*'))))
+        for index, run in enumerate(runs):
+            is_last = index == len(runs) - 1
+            if run.group('cjk'):
+                cjk = run.group('cjk')
+                if len(cjk) < ngram_size:
+                    phrases.append(([cjk], True))
+                else:
+                    phrases.append((_shingle(cjk, ngram_size, with_tail=False), explicit_prefix and is_last))
+            else:
+                phrases.append(([run.group('word')], explicit_prefix and is_last))
+
+    if prefix_last and phrases:
+        tokens, _ = phrases[-1]
+        phrases[-1] = (tokens, True)
+    return phrases
+
+
+def highlight_terms(query):
+    """提取查询中用于高亮的原始词（已归一化）"""
+    terms = []
+    for match in QUERY_PATTERN.finditer(query or ''):
+        text = match.group(1) if match.group(1) is not None else match.group(2).rstrip('*')
+        terms.extend(run.group(0) for run in TOKEN_PATTERN.finditer(normalize(text)))
+    # 长词优先，避免短词截断长词的高亮
+    return sorted(set(terms), key=len, reverse=True)
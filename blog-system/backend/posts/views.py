@@ -1,18 +1,33 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Count, F, FloatField, ExpressionWrapper
-from django.utils import timezone
-from datetime import timedelta
-from django.contrib.contenttypes.models import ContentType
-from .models import Post, PostLike, PostView
+from django.db.models import Q, F, FloatField, ExpressionWrapper, Case, When, IntegerField
+from django.conf import settings
+from .models import Post, PostLike
+from categories.models import Category
+from tags.models import Tag
+from comments.models import Comment
+from users.models import User
 from .serializers import PostListSerializer, PostDetailSerializer, PostCreateUpdateSerializer
+from .search import get_search_backend
+from .suggestions import suggestion_index
+from .counters import view_counter
+from .hot import get_hot_posts, refresh_hot_scores
+from .archives import get_archives, get_archive_months
+from .rendering import defer_large_renders
 from .utils import verify_content_password, mark_password_verified_in_session, check_password_verified_in_session
 from common.response import api_response, api_error_response
+from common.projection import ProjectedListMixin
+from common.likes import toggle_like
+from common.cache import CachedResponseMixin
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(CachedResponseMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """文章视图集"""
+    # 评论数随评论变更刷新，点赞数随点赞记录变更刷新
+    cache_models = (Post, Category, Tag, User, Comment, PostLike)
+    # 详情需要在缓存之外记录浏览，见 retrieve
+    cached_actions = ('list',)
     queryset = Post.objects.filter(status='published').select_related('author', 'category').prefetch_related('tags')
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
@@ -20,6 +35,8 @@ class PostViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'excerpt', 'content']  # SearchFilter 使用，但我们自定义了搜索逻辑
     ordering_fields = ['created_at', 'published_at', 'views', 'likes']
     ordering = ['-is_top', '-published_at']
+    # 键集分页（cursor 参数）的排序，最后一个字段保证唯一
+    cursor_ordering = ('-is_top', '-published_at', '-id')
     
     def get_filter_backends(self):
         """自定义 filter backends，排除 SearchFilter，因为我们自己处理搜索"""
@@ -29,7 +46,8 @@ class PostViewSet(viewsets.ModelViewSet):
     
     def list(self, request, *args, **kwargs):
         """列表查询，支持搜索和筛选，优化相关度排序"""
-        queryset = self.get_queryset()
+        # 只加载列表序列化器用到的列（不读取正文等大字段）
+        queryset = self.project_queryset(self.get_queryset())
         
         # 状态筛选（管理员功能）
         status_param = request.query_params.get('status', None)
@@ -41,42 +59,42 @@ class PostViewSet(viewsets.ModelViewSet):
         filter_backend = DjangoFilterBackend()
         queryset = filter_backend.filter_queryset(request, queryset, self)
         
-        # 处理自定义搜索
-        search = request.query_params.get('search', None)
+        # 处理自定义搜索（使用全文索引，按相关度排序）
+        search = request.query_params.get('search', '').strip()
+        search_backend = get_search_backend() if search else None
+        if search or request.query_params.get('ordering'):
+            # 按相关度或指定字段排序时不能使用键集分页
+            self.cursor_ordering = None
         if search:
-            search = search.strip()
-            if search:
-                # 使用 Q 对象构建复杂搜索查询
-                search_query = Q(title__icontains=search) | Q(excerpt__icontains=search) | Q(content__icontains=search)
-                queryset = queryset.filter(search_query)
-                
-                # 相关度排序：标题匹配 > 摘要匹配 > 内容匹配
-                from django.db.models import Case, When, IntegerField
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(title__icontains=search, then=3),
-                        When(excerpt__icontains=search, then=2),
-                        When(content__icontains=search, then=1),
-                        default=0,
-                        output_field=IntegerField()
-                    )
-                ).order_by('-relevance', '-published_at', '-created_at')
+            hits = search_backend.search(search, limit=settings.POST_SEARCH_MAX_RESULTS)
+            post_ids = [post_id for post_id, _ in hits]
+            queryset = queryset.filter(id__in=post_ids).order_by(
+                Case(
+                    *[When(id=post_id, then=position) for position, post_id in enumerate(post_ids)],
+                    default=len(post_ids),
+                    output_field=IntegerField()
+                )
+            )
         else:
             # 如果没有搜索，使用默认排序
             queryset = queryset.order_by('-is_top', '-published_at')
         
-        # 应用排序
+        # 应用排序（搜索时仅在显式指定 ordering 参数时覆盖相关度排序）
         from rest_framework.filters import OrderingFilter
-        ordering_backend = OrderingFilter()
-        queryset = ordering_backend.filter_queryset(request, queryset, self)
+        if not search or request.query_params.get('ordering'):
+            ordering_backend = OrderingFilter()
+            queryset = ordering_backend.filter_queryset(request, queryset, self)
         
         # 分页
         page = self.paginate_queryset(queryset)
+        posts = page if page is not None else queryset
+        context = self.get_serializer_context()
+        if search:
+            # 只为当前页生成高亮片段
+            context['search_highlights'] = search_backend.highlight(search, [post.id for post in posts])
+        serializer = self.get_serializer(posts, many=True, context=context)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
     def get_serializer_class(self):
@@ -88,15 +106,23 @@ class PostViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, *args, **kwargs):
         """获取文章详情并记录浏览"""
-        instance = self.get_object()
-        
-        # 记录浏览（避免短时间内重复记录）
-        self._record_view(instance, request)
+        response = self.cached_response(
+            request, lambda: Response(self.get_serializer(self.get_object(), context={'request': request}).data)
+        )
         
-        serializer = self.get_serializer(instance, context={'request': request})
-        return Response(serializer.data)
+        # 记录浏览（避免短时间内重复记录），缓存命中和 304 时同样计数
+        if response.status_code == status.HTTP_304_NOT_MODIFIED:
+            post_id = self.get_queryset().filter(slug=kwargs['slug']).values_list('id', flat=True).first()
+            if post_id is not None:
+                self._record_view(post_id, request)
+            return response
+        post_id = response.data['id']
+        self._record_view(post_id, request)
+        # 返回值包含尚未写入数据库的浏览量
+        response.data['views'] += view_counter.pending_views(post_id)
+        return response
 
-    def _record_view(self, post, request):
+    def _record_view(self, post_id, request):
         """记录文章浏览"""
         # 获取客户端IP地址
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -108,24 +134,8 @@ class PostViewSet(viewsets.ModelViewSet):
         # 获取用户代理
         user_agent = request.META.get('HTTP_USER_AGENT', '')
         
-        # 检查是否在最近1小时内已经浏览过（避免重复记录）
-        one_hour_ago = timezone.now() - timedelta(hours=1)
-        recent_view = PostView.objects.filter(
-            post=post,
-            ip_address=ip_address,
-            viewed_at__gte=one_hour_ago
-        ).first()
-        
-        if not recent_view:
-            # 创建浏览记录
-            PostView.objects.create(
-                post=post,
-                ip_address=ip_address,
-                user_agent=user_agent
-            )
-            # 更新文章浏览量
-            post.views += 1
-            post.save(update_fields=['views'])
+        # 同一 IP 在去重窗口内只计一次，增量由计数器批量写入数据库
+        view_counter.record(post_id, ip_address, user_agent)
 
     def get_queryset(self):
         # 管理员可以查看所有文章（包括草稿）
@@ -149,49 +159,50 @@ class PostViewSet(viewsets.ModelViewSet):
     def like(self, request, slug=None):
         """点赞文章"""
         post = self.get_object()
-        like, created = PostLike.objects.get_or_create(
-            post=post,
-            user=request.user
-        )
-        if not created:
-            like.delete()
-            post.likes = max(0, post.likes - 1)
-            liked = False
-        else:
-            post.likes += 1
-            liked = True
-        post.save(update_fields=['likes'])
-        return Response({'liked': liked, 'likes': post.likes})
+        liked, likes = toggle_like(PostLike, post, request.user)
+        refresh_hot_scores([post.id])
+        return Response({'liked': liked, 'likes': likes})
 
     @action(detail=True, methods=['get'])
     def related(self, request, slug=None):
         """获取相关文章"""
         post = self.get_object()
-        # 优化查询：避免N+1问题，使用prefetch_related
-        related_posts = Post.objects.filter(
-            Q(category=post.category) | Q(tags__in=post.tags.all()),
+        # 读取预计算的相关文章（按相关度排序）
+        related_posts = self.project_queryset(Post.objects.filter(
+            related_from__post=post,
             status='published'
-        ).exclude(id=post.id).distinct().select_related('author', 'category').prefetch_related('tags')[:5]
+        ), PostListSerializer).order_by('-related_from__score')[:5]
+        if not related_posts:
+            # 相关文章尚未计算时，退化为同分类或同标签的文章
+            related_posts = self.project_queryset(Post.objects.filter(
+                Q(category=post.category) | Q(tags__in=post.tags.all()),
+                status='published'
+            ).exclude(id=post.id).distinct(), PostListSerializer)[:5]
         serializer = PostListSerializer(related_posts, many=True, context={'request': request})
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def archives(self, request):
-        """归档页面 - 优化性能"""
-        posts = self.get_queryset().order_by('-published_at')
-        # 批量序列化以提高性能
-        serializer = PostListSerializer(posts, many=True, context={'request': request})
-        archives = {}
-        for post_data in serializer.data:
-            published_at = post_data['published_at'] or post_data['created_at']
-            year = int(published_at[:4])
-            month = int(published_at[5:7])
-            key = f"{year}-{month:02d}"
-            if key not in archives:
-                archives[key] = []
-            archives[key].append(post_data)
-        return Response(archives)
-    
+        """归档页面（可通过 year 参数按年分页）"""
+        year = request.query_params.get('year')
+        if year is not None:
+            try:
+                year = int(year)
+            except ValueError:
+                return api_error_response('年份格式不正确')
+        return Response(get_archives(self._get_archive_queryset(), year))
+
+    @action(detail=False, methods=['get'], url_path='archives/months')
+    def archive_months(self, request):
+        """归档月份及每月文章数"""
+        return Response(get_archive_months(self._get_archive_queryset()))
+
+    def _get_archive_queryset(self):
+        """登录用户可以看到自己的草稿，不使用公开归档的缓存"""
+        if self.request.user.is_authenticated:
+            return self.get_queryset()
+        return None
+
     @action(detail=True, methods=['post'])
     def verify_password(self, request, slug=None):
         """验证文章密码"""
@@ -235,8 +246,9 @@ class PostViewSet(viewsets.ModelViewSet):
             )
             
             if serializer.is_valid():
-                # 自动保存时，确保状态为草稿
-                saved_post = serializer.save()
+                # 自动保存时，确保状态为草稿（较长的文章在后台渲染）
+                with defer_large_renders():
+                    saved_post = serializer.save()
                 if saved_post.status != 'draft':
                     saved_post.status = 'draft'
                     saved_post.save()
@@ -274,7 +286,8 @@ class PostViewSet(viewsets.ModelViewSet):
                 post_data['status'] = 'draft'
                 post_data['author'] = request.user
                 
-                saved_post = serializer.save()
+                with defer_large_renders():
+                    saved_post = serializer.save()
                 
                 return api_response(
                     {
@@ -295,60 +308,7 @@ class PostViewSet(viewsets.ModelViewSet):
     def hot(self, request):
         """获取热门文章（基于浏览量、点赞数、评论数、时间衰减的综合评分）"""
         try:
-            from comments.models import Comment
-            
-            # 获取 ContentType for Post
-            post_content_type = ContentType.objects.get_for_model(Post)
-            
-            # 计算时间衰减因子（文章发布后的天数）
-            now = timezone.now()
-            
-            # 获取已发布的文章
-            posts_list = list(Post.objects.filter(
-                status='published',
-                is_encrypted=False  # 排除加密文章
-            ).select_related('author', 'category').prefetch_related('tags'))
-            
-            if not posts_list:
-                return Response([])
-            
-            # 批量获取评论数
-            post_ids = [p.id for p in posts_list]
-            comment_counts = Comment.objects.filter(
-                content_type=post_content_type,
-                object_id__in=post_ids,
-                is_approved=True
-            ).values('object_id').annotate(count=Count('id'))
-            
-            comment_count_dict = {item['object_id']: item['count'] for item in comment_counts}
-            
-            # 为每篇文章计算热门度评分
-            scored_posts = []
-            for post in posts_list:
-                comment_count = comment_count_dict.get(post.id, 0)
-                
-                # 计算发布后的天数
-                if post.published_at:
-                    days = (now - post.published_at).total_seconds() / 86400  # 转换为天数
-                else:
-                    days = (now - post.created_at).total_seconds() / 86400
-                
-                # 热门度评分公式：score = (views * 0.3 + likes * 0.4 + comment_count * 0.3) / (days + 1)^0.5
-                # 时间衰减：越新的文章权重越高
-                hot_score = (
-                    post.views * 0.3 +
-                    post.likes * 0.4 +
-                    comment_count * 0.3
-                ) / ((days + 1) ** 0.5)
-                
-                scored_posts.append((post, hot_score))
-            
-            # 按热门度排序
-            scored_posts.sort(key=lambda x: x[1], reverse=True)
-            
-            # 取前10篇
-            hot_posts = [post for post, _ in scored_posts[:10]]
-            
+            hot_posts = get_hot_posts(limit=10, queryset=self.project_queryset(Post.objects.all(), PostListSerializer))
             serializer = PostListSerializer(hot_posts, many=True, context={'request': request})
             return Response(serializer.data)
         except Exception as e:
@@ -356,23 +316,15 @@ class PostViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def search_suggestions(self, request):
-        """获取搜索建议（基于标题和摘要）"""
+        """获取搜索建议（基于标题和标签的内存索引）"""
         try:
             keyword = request.query_params.get('q', '').strip()
             if not keyword or len(keyword) < 2:
                 return Response([])
             
-            # 搜索标题和摘要中包含关键词的文章
-            suggestions = Post.objects.filter(
-                status='published',
-                is_encrypted=False
-            ).filter(
-                Q(title__icontains=keyword) | Q(excerpt__icontains=keyword)
-            ).values_list('title', flat=True).distinct()[:5]
-            
-            return Response(list(suggestions))
+            return Response(suggestion_index.suggest(keyword, limit=5))
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
             logger.error(f'获取搜索建议失败：{str(e)}', exc_info=True)
-            return Response([])  # 失败时返回空数组，不抛出错误
\ No newline at end of file
+            return Response([])  # 失败时返回空数组，不抛出错误
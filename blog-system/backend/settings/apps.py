@@ -5,3 +5,6 @@ class SettingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'settings'
     verbose_name = '站点设置'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,4 +1,51 @@
-from django.db import models
+import copy
+import threading
+import time
+from django.conf import settings as django_settings
+from django.db import models, transaction
+from common.cache import get_generation, bump_generation
+
+SETTINGS_GENERATION_NAMESPACE = 'site_settings'
+NAVIGATION_GENERATION_NAMESPACE = 'navigation'
+
+
+class _ProcessCache:
+    """
+    很少变化的数据的进程内缓存
+
+    共享缓存中的版本号在数据变更时更新；各进程最多每 SITE_SETTINGS_CHECK_INTERVAL 秒
+    比较一次版本号，版本变化时重新读取数据库，其余时间不访问数据库和共享缓存。
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._value = None
+        self._generation = None
+        self._checked_at = 0
+
+    def get(self, load):
+        interval = getattr(django_settings, 'SITE_SETTINGS_CHECK_INTERVAL', 1)
+        # invalidate() 不加锁，其他线程随时可能把 _value 置为 None，只读取一次并返回局部变量
+        value = self._value
+        if value is None or time.monotonic() - self._checked_at >= interval:
+            generation = get_generation(self.namespace)
+            with self._lock:
+                value = self._value
+                if value is None or generation != self._generation:
+                    value = self._value = load()
+                    self._generation = generation
+                self._checked_at = time.monotonic()
+        return value
+
+    def invalidate(self):
+        # 不加锁：load 中写入数据（如 get_or_create 创建实例）会在持有锁的情况下调用这里
+        self._value = None
+        bump_generation(self.namespace)
+
+
+_settings_cache = _ProcessCache(SETTINGS_GENERATION_NAMESPACE)
+navigation_cache = _ProcessCache(NAVIGATION_GENERATION_NAMESPACE)
 
 
 class SiteSettings(models.Model):
@@ -39,10 +86,18 @@ class SiteSettings(models.Model):
         """确保只有一个实例"""
         self.pk = 1
         super().save(*args, **kwargs)
+        # 提交后再更新版本号，避免其他进程在提交前重新读到旧数据
+        transaction.on_commit(_settings_cache.invalidate)
 
     @classmethod
     def get_settings(cls):
-        """获取站点设置（单例）"""
+        """获取站点设置（单例，进程内缓存，其他进程的修改最多 SITE_SETTINGS_CHECK_INTERVAL 秒后生效）"""
+        # 返回副本，调用方修改实例不影响缓存
+        return copy.copy(_settings_cache.get(cls.load_settings))
+
+    @classmethod
+    def load_settings(cls):
+        """从数据库读取站点设置（不存在时创建）"""
         settings, created = cls.objects.get_or_create(pk=1, defaults={'site_name': '我的博客'})
         return settings
 
@@ -84,16 +139,42 @@ class NavigationItem(models.Model):
                 defaults=item_data
             )
     
+    @classmethod
+    def get_menu(cls):
+        """获取导航菜单（进程内缓存，菜单项变更后由信号使缓存失效）"""
+        return navigation_cache.get(cls.load_menu)
+
+    @classmethod
+    def load_menu(cls):
+        """从数据库读取导航菜单（没有菜单项时先初始化内置菜单）"""
+        items = list(cls.objects.all())
+        if not items:
+            cls.initialize_builtin_items()
+            items = list(cls.objects.all())
+        return NavigationMenu(items)
+
     @classmethod
     def check_url_access(cls, url_path):
         """检查URL是否可以访问"""
         try:
-            # 标准化URL路径（移除末尾的斜杠）
-            normalized_path = url_path.rstrip('/') or '/'
-            item = cls.objects.filter(url=normalized_path).first()
-            if item:
-                return item.is_accessible
-            # 如果没有找到对应的菜单项，默认允许访问（兼容其他路由）
-            return True
+            return cls.get_menu().is_accessible(url_path)
         except Exception:
             return True
+
+
+class NavigationMenu:
+    """导航菜单快照：按顺序排列的全部菜单项、可见菜单项，以及 URL 到是否可访问的映射"""
+
+    def __init__(self, items):
+        self.items = tuple(items)
+        self.visible_items = tuple(item for item in self.items if item.is_visible)
+        self._accessible = {}
+        for item in self.items:
+            # 同一 URL 有多个菜单项时与原先的查询一致，取排序最靠前的一项
+            self._accessible.setdefault(item.url, item.is_accessible)
+
+    def is_accessible(self, url_path):
+        # 标准化URL路径（移除末尾的斜杠）
+        normalized_path = url_path.rstrip('/') or '/'
+        # 如果没有找到对应的菜单项，默认允许访问（兼容其他路由）
+        return self._accessible.get(normalized_path, True)
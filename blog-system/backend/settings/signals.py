@@ -0,0 +1,14 @@
+"""
+站点设置相关信号处理
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import NavigationItem, navigation_cache
+
+
+@receiver(post_save, sender=NavigationItem)
+@receiver(post_delete, sender=NavigationItem)
+def invalidate_navigation_menu(sender, **kwargs):
+    """菜单项保存或删除后使导航菜单缓存失效（提交后再更新版本号，避免其他进程读到旧数据）"""
+    transaction.on_commit(navigation_cache.invalidate)
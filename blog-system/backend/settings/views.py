@@ -7,10 +7,12 @@ from .serializers import (
     NavigationItemSerializer, NavigationItemCreateUpdateSerializer
 )
 from common.email import send_email_notification
+from common.cache import CachedResponseMixin
 
 
-class SiteSettingsViewSet(viewsets.ModelViewSet):
+class SiteSettingsViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """站点设置视图集"""
+    cache_models = (SiteSettings,)
     queryset = SiteSettings.objects.all()
     permission_classes = [permissions.AllowAny]  # 获取设置允许任何人访问
     lookup_field = 'pk'
@@ -119,8 +121,9 @@ class SiteSettingsViewSet(viewsets.ModelViewSet):
             )
 
 
-class NavigationItemViewSet(viewsets.ModelViewSet):
+class NavigationItemViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """导航菜单视图集"""
+    cache_models = (NavigationItem,)
     queryset = NavigationItem.objects.all()
     permission_classes = [permissions.AllowAny]  # 获取菜单允许任何人访问
     
@@ -137,9 +140,8 @@ class NavigationItemViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """获取可见的导航菜单"""
-        # 如果数据库中没有菜单，先初始化
-        if not NavigationItem.objects.exists():
-            NavigationItem.initialize_builtin_items()
+        # 如果数据库中没有菜单，先初始化（由菜单缓存完成，缓存有效时不查询数据库）
+        NavigationItem.get_menu()
         
         queryset = super().get_queryset()
         # 对于 list 和 retrieve 操作（前端获取），始终只返回可见的菜单
@@ -150,18 +152,17 @@ class NavigationItemViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         """重写 list 方法，管理员可以查看所有菜单项，普通用户只能看到可见的"""
-        # 如果数据库中没有菜单，先初始化
-        if not NavigationItem.objects.exists():
-            NavigationItem.initialize_builtin_items()
+        # 菜单项从进程内缓存读取，不查询数据库
+        menu = NavigationItem.get_menu()
         
         # 管理员可以查看所有菜单项（包括隐藏的）
         if request.user.is_authenticated and request.user.is_staff:
-            queryset = NavigationItem.objects.all().order_by('order', 'id')
+            items = menu.items
         else:
             # 普通用户只获取可见的菜单项
-            queryset = NavigationItem.objects.filter(is_visible=True).order_by('order', 'id')
+            items = menu.visible_items
         
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(items, many=True)
         return Response(serializer.data)
 
     def destroy(self, request, *args, **kwargs):
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:51
+
+from django.db import migrations, models
+
+
+def backfill_post_counts(apps, schema_editor):
+    """统计现有标签的已发布文章数"""
+    Tag = apps.get_model('tags', 'Tag')
+    Post = apps.get_model('posts', 'Post')
+
+    counts = {}
+    for tag_id in Post.tags.through.objects.filter(post__status='published').values_list('tag_id', flat=True):
+        counts[tag_id] = counts.get(tag_id, 0) + 1
+    for tag_id, count in counts.items():
+        Tag.objects.filter(pk=tag_id).update(post_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0001_initial'),
+        ('posts', '0010_posttermvector_relatedpost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='已发布的文章数，由系统自动维护', verbose_name='文章数'),
+        ),
+        migrations.RunPython(backfill_post_counts, migrations.RunPython.noop),
+    ]
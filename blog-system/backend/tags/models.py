@@ -8,6 +8,7 @@ class Tag(models.Model):
     slug = models.SlugField(max_length=50, unique=True, verbose_name='URL 别名')
     description = models.TextField(blank=True, verbose_name='描述')
     color = models.CharField(max_length=7, default='#FE9600', verbose_name='颜色')
+    post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='文章数', help_text='已发布的文章数，由系统自动维护')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
 
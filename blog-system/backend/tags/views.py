@@ -1,10 +1,14 @@
 from rest_framework import viewsets, permissions
 from .models import Tag
 from .serializers import TagSerializer
+from posts.models import Post
+from common.cache import CachedResponseMixin
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """标签视图集"""
+    # 文章数随文章发布、撤回刷新
+    cache_models = (Tag, Post)
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     lookup_field = 'slug'
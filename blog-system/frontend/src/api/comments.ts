@@ -9,7 +9,9 @@ export interface Comment {
   }
   content: string
   parent?: number
+  depth?: number
   replies?: Comment[]
+  reply_count?: number
   likes_count: number
   is_liked: boolean
   is_approved?: boolean
@@ -54,8 +56,8 @@ export const commentsApi = {
   },
 
   // 点赞评论
-  likeComment: async (id: number): Promise<void> => {
-    return api.post<void>(`/comments/${id}/like/`)
+  likeComment: async (id: number): Promise<{ liked: boolean; likes: number }> => {
+    return api.post<{ liked: boolean; likes: number }>(`/comments/${id}/like/`)
   },
 
   // 获取所有评论（管理员）
@@ -9,7 +9,7 @@ export interface Music {
   audio_url: string
   cover: string
   cover_url: string | null
-  lyrics: string
+  lyrics?: string // 列表接口不返回歌词，需通过详情接口获取
   duration: number | null
   order: number
   is_published: boolean
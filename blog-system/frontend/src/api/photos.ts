@@ -20,7 +20,7 @@ export interface Album {
     username: string
     avatar?: string
   }
-  photos: Photo[]
+  photos?: Photo[] // 列表接口不返回照片
   photos_count: number
   is_encrypted?: boolean
   is_password_verified?: boolean
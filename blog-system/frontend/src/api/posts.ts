@@ -47,6 +47,19 @@ export interface TOCItem {
   children: TOCItem[]
 }
 
+export interface ArchivePost {
+  id: number
+  title: string
+  slug: string
+  published_at: string | null
+  created_at: string
+}
+
+export interface ArchiveMonth {
+  month: string
+  count: number
+}
+
 export interface PostListResponse {
   count: number
   next: string | null
@@ -129,8 +142,13 @@ export const postsApi = {
   },
 
   // 获取归档
-  getArchives: async (): Promise<Record<string, Post[]>> => {
-    return api.get<Record<string, Post[]>>('/posts/archives/')
+  getArchives: async (year?: number): Promise<Record<string, ArchivePost[]>> => {
+    return api.get<Record<string, ArchivePost[]>>('/posts/archives/', { params: year ? { year } : undefined })
+  },
+
+  // 获取归档月份及每月文章数
+  getArchiveMonths: async (): Promise<ArchiveMonth[]> => {
+    return api.get<ArchiveMonth[]>('/posts/archives/months/')
   },
 
   // 验证文章密码